@@ -0,0 +1,129 @@
+"""
+Бенчмарк холодного старту точок входу.
+
+Кожен скрипт імпортується в окремому процесі через
+python -X importtime -c "runpy.run_path(<скрипт>, run_name='bench_startup')",
+тобто без блоку __main__: міряється саме вартість імпорту модуля. З виводу
+importtime береться сумарний кумулятивний час імпортів верхнього рівня і
+найважчі пакети, плюс загальний час процесу. Кожен замір повторюється кілька
+разів і береться мінімум.
+
+Приклад:
+    python bench_startup.py --output startup.json
+    python bench_startup.py --baseline startup.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = [
+    'lab2AD.py', 'lab3AD.py', 'lab4AD.py', 'lab4AD2.0.py',
+    'lab5AD.py', 'lab5AD2.0.py', 'lab5AD3.0.py',
+]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_importtime(stderr):
+    """Повертає {пакет верхнього рівня: кумулятивний час, мкс} з виводу -X importtime."""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            _, cumulative, name = line[len('import time:'):].split('|', 2)
+            cumulative = int(cumulative)
+        except ValueError:
+            continue
+        # Вкладені імпорти мають відступ у назві; рахуємо лише верхній рівень,
+        # інакше час вкладених модулів врахувався б двічі.
+        if name.startswith('  ') or not name.strip():
+            continue
+        package = name.strip().split('.')[0]
+        totals[package] = totals.get(package, 0) + cumulative
+    return totals
+
+
+def measure(script=None, repeat=3, python=sys.executable):
+    # script=None — опорний замір голого інтерпретатора.
+    code = f"import runpy; runpy.run_path({script!r}, run_name='bench_startup')" if script else 'pass'
+    env = dict(os.environ, MPLBACKEND='Agg')
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([python, '-X', 'importtime', '-c', code], cwd=HERE, env=env,
+                              capture_output=True, text=True)
+        wall_ms = (time.perf_counter() - start) * 1e3
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return {'error': lines[-1] if lines else f'код виходу {proc.returncode}'}
+        packages = parse_importtime(proc.stderr)
+        result = {
+            'import_ms': sum(packages.values()) / 1e3,
+            'wall_ms': wall_ms,
+            'heaviest': sorted(((name, us / 1e3) for name, us in packages.items()),
+                               key=lambda item: -item[1])[:5],
+        }
+        if best is None or result['wall_ms'] < best['wall_ms']:
+            best = result
+    return best
+
+
+def run(scripts, repeat=3):
+    results = {'python': measure(None, repeat)}
+    for script in scripts:
+        results[script] = measure(script, repeat)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old or 'error' in result or 'error' in old:
+            continue
+        ratio = result['import_ms'] / max(old['import_ms'], 1e-3)
+        print(f"{name}: {old['import_ms']:.1f} мс -> {result['import_ms']:.1f} мс ({ratio - 1:+.0%})")
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Час холодного старту точок входу")
+    parser.add_argument('scripts', nargs='*', default=ENTRY_POINTS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="зберегти результати у JSON")
+    parser.add_argument('--baseline', help="JSON попереднього запуску для порівняння")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="допустиме відносне погіршення часу імпорту")
+    args = parser.parse_args()
+
+    results = run(args.scripts, args.repeat)
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name}: помилка імпорту — {result['error']}")
+            continue
+        heaviest = ', '.join(f"{pkg} {ms:.0f} мс" for pkg, ms in result['heaviest'])
+        print(f"{name}: імпорт {result['import_ms']:.1f} мс, процес {result['wall_ms']:.1f} мс"
+              + (f" | {heaviest}" if heaviest else ""))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Погіршення понад {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+Регресійний бенчмарк підсистем на синтетичних даних.
+
+Вхідні дані генерує synthetic_data у кількох масштабах (SCALES), тож заміри
+не потребують файлів з D:\\AD\\... і відтворюються на будь-якій машині.
+Кожен випадок — пара (підготовка, дія): підготовка (генерація, завантаження,
+прогрів) не міряється, дія повторюється кілька разів і береться мінімум.
+Поруч із часом зберігається розмір результату: якщо він змінився між
+запусками, порівнювати час уже немає сенсу.
+
+Результати пишуться в JSON і порівнюються з базовим запуском так само, як у
+bench_startup.py: код виходу 1, якщо якийсь випадок повільніший за базу
+більше ніж на tolerance.
+
+Приклад:
+    python bench_suite.py --scales small medium --output bench.json
+    python bench_suite.py --scales small medium --baseline bench.json --tolerance 0.25
+    python bench_suite.py --scales large --cases vhi power.load --data-dir bench_data
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from instrument import record_time, setup_from_env
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SCALES = {
+    'small': {'provinces': 5, 'years': 20, 'power_rows': 100_000, 'mpg_rows': 400, 'signals': 500},
+    'medium': {'provinces': 25, 'years': 44, 'power_rows': 500_000, 'mpg_rows': 5_000, 'signals': 5_000},
+    # Розмір household_power_consumption.txt — 2 075 259 рядків.
+    'large': {'provinces': 100, 'years': 44, 'power_rows': 2_075_259, 'mpg_rows': 10_000, 'signals': 20_000},
+}
+END_YEAR = 2024
+SEED = 0
+
+
+class Workspace:
+    """Згенеровані файли одного масштабу та ліниво підготовлені об'єкти над ними."""
+
+    def __init__(self, root, params, workers=None):
+        self.root = root
+        self.params = params
+        self.workers = workers
+        self.raw_dir = os.path.join(root, 'raw')
+        self.store_root = os.path.join(root, 'vhi_store')
+        self.power_path = os.path.join(root, 'household_power_consumption.txt')
+        self.mpg_path = os.path.join(root, 'auto-mpg.data')
+        self._cache = {}
+
+    def generate(self):
+        import synthetic_data
+
+        marker = os.path.join(self.root, 'params.json')
+        if os.path.exists(marker):
+            with open(marker, encoding='utf-8') as f:
+                if json.load(f) == self.params:
+                    return self
+            shutil.rmtree(self.root)
+        start_year = END_YEAR - self.params['years'] + 1
+        synthetic_data.write_vhi_csvs(os.path.join(self.raw_dir, 'UKR', 'Mean'), self.params['provinces'],
+                                      start_year, END_YEAR, SEED)
+        synthetic_data.write_power_file(self.power_path, self.params['power_rows'], seed=SEED)
+        synthetic_data.write_mpg_file(self.mpg_path, self.params['mpg_rows'], seed=SEED)
+        with open(marker, 'w', encoding='utf-8') as f:
+            json.dump(self.params, f)
+        return self
+
+    def cached(self, name, factory):
+        if name not in self._cache:
+            with contextlib.redirect_stdout(io.StringIO()):
+                self._cache[name] = factory()
+        return self._cache[name]
+
+    def vhi_files(self):
+        from vhi_ingest import latest_raw_files
+
+        return sorted(latest_raw_files(self.raw_dir, 'UKR').items())
+
+    def vhi_frame(self):
+        import pandas as pd
+        from vhi_schema import parse_vhi_csv
+
+        return self.cached('vhi_frame', lambda: pd.concat(
+            [parse_vhi_csv(path, pid)[0] for pid, path in self.vhi_files()], ignore_index=True))
+
+    def store(self):
+        def build():
+            _ingest(self)
+            return self.store_root
+
+        return self.cached('store', build)
+
+    def power_dataset(self):
+        import lab4AD
+
+        return self.cached('power', lambda: lab4AD.load_and_prepare_data(self.power_path, quarantine_dir=None))
+
+    def mpg_frame(self):
+        return self.cached('mpg', lambda: _load_mpg()(self.mpg_path))
+
+
+def _load_mpg():
+    import runpy
+
+    return runpy.run_path(os.path.join(HERE, 'lab4AD2.0.py'), run_name='bench_suite')['load_data']
+
+
+# --- VHI ---------------------------------------------------------------------
+
+def _vhi_queries():
+    from vhi_query import VhiQuery
+
+    return [
+        VhiQuery(),
+        VhiQuery(season='summer', aggregate='mean', by='province_year'),
+        VhiQuery(regions=range(1, 6), years=(2005, 2015), season='winter'),
+        VhiQuery(aggregate='min', by='week'),
+        VhiQuery(index='vci', aggregate='median', by='province', sort=['vci'], descending=True),
+    ]
+
+
+def _parse(files):
+    from vhi_schema import parse_vhi_csv
+
+    return sum(len(parse_vhi_csv(path, pid)[0]) for pid, path in files)
+
+
+def _ingest(ws):
+    from vhi_ingest import ingest
+
+    report = ingest({'UKR': None}, raw_dir=ws.raw_dir, store_root=ws.store_root, fetch=False, workers=ws.workers)
+    return sum(rows for *_, rows in report)
+
+
+def _query_cold(store_root):
+    from vhi_query import VhiQueryService
+
+    service = VhiQueryService.from_store(store_root)
+    return sum(service.run(query).total for query in _vhi_queries())
+
+
+def _warm_service(ws):
+    from vhi_query import VhiQueryService
+
+    service = VhiQueryService.from_store(ws.store())
+    queries = _vhi_queries()
+    for query in queries:
+        service.result(query)
+    return service, queries
+
+
+def _query_cached(prepared):
+    service, queries = prepared
+    return sum(service.run(query, page=2).total for query in queries)
+
+
+def _droughts(df):
+    from vhi_droughts import detect_episodes
+
+    return len(detect_episodes(df, 'vhi', threshold=15, min_duration=3))
+
+
+def _anomalies(df):
+    from vhi_anomaly import ClimatologyEngine
+
+    engine = ClimatologyEngine('vhi').fit(df)
+    engine.trends()
+    return len(engine.anomalies(df))
+
+
+# --- Споживання електроенергії (lab4AD) ---------------------------------------
+
+def _power_load(path):
+    import lab4AD
+
+    return len(lab4AD.load_and_prepare_data(path, quarantine_dir=None).frame)
+
+
+def _power_task(query, engine):
+    from dataset_query import ENGINES
+
+    def setup(ws):
+        dataset = ws.power_dataset()
+        dataset.table(engine)
+        return dataset
+
+    def run(dataset):
+        return ENGINES[engine].num_rows(dataset.run(query, engine))
+
+    return setup, run
+
+
+# --- auto-mpg (lab4AD2.0) -----------------------------------------------------
+
+def _mpg_pipeline(df):
+    from mpg_pipeline import FeaturePipeline
+
+    pipeline = FeaturePipeline(['mpg', 'cylinders', 'displacement'], categorical_columns=['origin']).fit(df)
+    pipeline.transform(df, scaling='minmax')
+    pipeline.transform(df, scaling='standard')
+    return len(pipeline.encode(df))
+
+
+def _mpg_corr(df):
+    from mpg_corr import CorrelationEngine
+
+    engine = CorrelationEngine(df.select_dtypes(include='number'))
+    for method in ('pearson', 'spearman'):
+        engine.pair_confidence_interval('horsepower', 'mpg', method=method, seed=42)
+    return engine.n
+
+
+# --- Фільтри сигналів (lab5AD2.0) ---------------------------------------------
+
+def _noise_batch(ws):
+    import numpy as np
+    from filter_montecarlo import FILTER_TYPES, T, design_filter
+
+    coefficients = [design_filter(name, 5.0, 5) for name in FILTER_TYPES]
+    noise = np.random.default_rng(SEED).standard_normal((ws.params['signals'], len(T)))
+    return coefficients, noise
+
+
+def _filtfilt(prepared):
+    from scipy.signal import filtfilt
+
+    coefficients, noise = prepared
+    for b, a in coefficients:
+        filtfilt(b, a, noise, axis=1)
+    return len(noise) * len(coefficients)
+
+
+def _montecarlo(n):
+    from filter_montecarlo import run_study
+
+    study = run_study(n, covariances=(0.05, 0.1, 0.5), batch_size=min(n, 2000), workers=0, seed=SEED)
+    return len(study['results'])
+
+
+def cases():
+    """{назва: (підготовка(ws) -> аргумент, дія(аргумент) -> розмір результату)}."""
+    from dataset_query import available_engines
+    from lab4AD import TASKS
+
+    table = {
+        'vhi.parse': (Workspace.vhi_files, _parse),
+        'vhi.ingest': (lambda ws: ws, _ingest),
+        'vhi.query.cold': (Workspace.store, _query_cold),
+        'vhi.query.cached': (_warm_service, _query_cached),
+        'vhi.droughts': (Workspace.vhi_frame, _droughts),
+        'vhi.anomaly': (Workspace.vhi_frame, _anomalies),
+        'power.load': (lambda ws: ws.power_path, _power_load),
+    }
+    for engine in available_engines():
+        for name, query in TASKS.items():
+            table[f"power.{name.lower().replace(' ', '')}.{engine}"] = _power_task(query, engine)
+    table.update({
+        'mpg.load': (lambda ws: ws.mpg_path, lambda path: len(_load_mpg()(path))),
+        'mpg.pipeline': (Workspace.mpg_frame, _mpg_pipeline),
+        'mpg.corr': (Workspace.mpg_frame, _mpg_corr),
+        'signal.filtfilt': (_noise_batch, _filtfilt),
+        'signal.montecarlo': (lambda ws: ws.params['signals'], _montecarlo),
+    })
+    return table
+
+
+def measure(run, arg, repeat=3):
+    best, rows = None, None
+    for _ in range(repeat):
+        # Звіти валідації та інший вивід підсистем не повинні впливати на замір.
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter_ns()
+            rows = run(arg)
+            elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def run_suite(scales, selected=None, repeat=3, data_dir=None, workers=None):
+    table = cases()
+    names = [name for name in table if not selected or name.startswith(tuple(selected))]
+    results = {}
+    with contextlib.ExitStack() as stack:
+        root = data_dir or stack.enter_context(tempfile.TemporaryDirectory(prefix='bench_suite_'))
+        for scale in scales:
+            ws = Workspace(os.path.join(root, scale), SCALES[scale], workers)
+            os.makedirs(ws.root, exist_ok=True)
+            ws.generate()
+            for name in names:
+                setup, run = table[name]
+                try:
+                    arg = setup(ws)
+                    elapsed, rows = measure(run, arg, repeat)
+                except Exception as e:
+                    results[f'{scale}/{name}'] = {'error': f'{type(e).__name__}: {e}'}
+                    continue
+                record_time(f'bench.{name}', elapsed)
+                results[f'{scale}/{name}'] = {'seconds': elapsed / 1e9, 'rows': int(rows)}
+                print(format_result(f'{scale}/{name}', results[f'{scale}/{name}']), flush=True)
+    return results
+
+
+def format_result(name, result):
+    if 'error' in result:
+        return f"{name:<36} помилка — {result['error']}"
+    return f"{name:<36} {result['seconds'] * 1e3:>10.1f} мс {result['rows']:>12}"
+
+
+def compare(results, baseline, tolerance, min_seconds=0.001):
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old or 'error' in result or 'error' in old:
+            continue
+        ratio = result['seconds'] / max(old['seconds'], 1e-6)
+        note = '' if old['rows'] == result['rows'] else f" [розмір результату {old['rows']} -> {result['rows']}]"
+        print(f"{name}: {old['seconds'] * 1e3:.1f} мс -> {result['seconds'] * 1e3:.1f} мс ({ratio - 1:+.0%}){note}")
+        # Заміри в частки мілісекунди шумлять сильніше за будь-який відносний поріг.
+        if ratio > 1 + tolerance and result['seconds'] - old['seconds'] > min_seconds:
+            regressions.append(name)
+    return regressions
+
+
+def environment():
+    import numpy as np
+    import pandas as pd
+
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'date': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Регресійний бенчмарк підсистем на синтетичних даних")
+    parser.add_argument('--scales', nargs='+', default=['small', 'medium'], choices=SCALES)
+    parser.add_argument('--cases', nargs='+', help="префікси назв випадків, наприклад vhi power.load")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', help="тека для згенерованих даних (зберігається між запусками)")
+    parser.add_argument('--workers', type=int, help="процесів для vhi_ingest")
+    parser.add_argument('--output', help="зберегти результати у JSON")
+    parser.add_argument('--baseline', help="JSON попереднього запуску для порівняння")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="допустиме відносне погіршення часу")
+    args = parser.parse_args()
+
+    setup_from_env('bench_suite')
+    results = run_suite(args.scales, args.cases, args.repeat, args.data_dir, args.workers)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.tolerance)
+        if regressions:
+            print(f"Погіршення понад {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+"""
+Спільна абстракція запитів над табличними даними з кількома рушіями.
+
+Запит описується один раз — як послідовність кроків (filter, select, sample,
+strided, aggregate) з виразами над стовпцями:
+
+    query = (Query()
+             .filter(col('Voltage') > 235)
+             .aggregate(by=['year'], mean_power=('Global_active_power', 'mean')))
+    result = dataset.collect(query, engine='numpy')
+
+і виконується будь-яким рушієм з ENGINES:
+    pandas — звичайні операції над DataFrame;
+    numpy  — типізовані стовпці (словник масивів) з вектором вибраних рядків:
+             фільтри лише звужують індекс, стовпці збираються один раз наприкінці;
+    polars — необов'язковий рушій на Arrow-пам'яті (потрібен пакет polars).
+
+Dataset один раз перетворює вихідний DataFrame у представлення кожного рушія
+і кешує його. benchmark() проганяє однакові запити на всіх доступних рушіях
+тим самим способом, fastest() обирає найшвидший рушій для кожного запиту.
+Агрегати пропускають пропуски (NaN), групи повертаються відсортованими за
+ключами.
+"""
+
+import functools
+import importlib.util
+import operator
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from instrument import record_time
+
+DEFAULT_ENGINE = os.environ.get('ADLABS_ENGINE', 'pandas')
+
+AGGREGATIONS = ('count', 'sum', 'mean', 'min', 'max', 'median', 'nunique')
+
+OPERATORS = {
+    '>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le,
+    '==': operator.eq, '!=': operator.ne, '&': operator.and_, '|': operator.or_,
+    '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+}
+
+
+class Expr:
+    __hash__ = None
+
+    def _binary(self, op, other):
+        return BinaryExpr(op, self, other if isinstance(other, Expr) else Lit(other))
+
+    def __gt__(self, other):
+        return self._binary('>', other)
+
+    def __ge__(self, other):
+        return self._binary('>=', other)
+
+    def __lt__(self, other):
+        return self._binary('<', other)
+
+    def __le__(self, other):
+        return self._binary('<=', other)
+
+    def __eq__(self, other):
+        return self._binary('==', other)
+
+    def __ne__(self, other):
+        return self._binary('!=', other)
+
+    def __and__(self, other):
+        return self._binary('&', other)
+
+    def __or__(self, other):
+        return self._binary('|', other)
+
+    def __add__(self, other):
+        return self._binary('+', other)
+
+    def __sub__(self, other):
+        return self._binary('-', other)
+
+    def __mul__(self, other):
+        return self._binary('*', other)
+
+    def __truediv__(self, other):
+        return self._binary('/', other)
+
+    def __invert__(self):
+        return NotExpr(self)
+
+    def between(self, low, high):
+        return (self >= low) & (self <= high)
+
+
+class Col(Expr):
+    def __init__(self, name):
+        self.name = name
+
+    def evaluate(self, engine, table):
+        return engine.column(table, self.name)
+
+
+class Lit(Expr):
+    def __init__(self, value):
+        self.value = value
+
+    def evaluate(self, engine, table):
+        return engine.literal(self.value)
+
+
+class BinaryExpr(Expr):
+    def __init__(self, op, left, right):
+        self.op, self.left, self.right = op, left, right
+
+    def evaluate(self, engine, table):
+        return OPERATORS[self.op](self.left.evaluate(engine, table), self.right.evaluate(engine, table))
+
+
+class NotExpr(Expr):
+    def __init__(self, operand):
+        self.operand = operand
+
+    def evaluate(self, engine, table):
+        return ~self.operand.evaluate(engine, table)
+
+
+class Greatest(Expr):
+    def __init__(self, *operands):
+        self.operands = operands
+
+    def evaluate(self, engine, table):
+        return engine.greatest([operand.evaluate(engine, table) for operand in self.operands])
+
+
+def col(name):
+    return Col(name)
+
+
+def greatest(*exprs):
+    """Построковий максимум кількох виразів (пропуски ігноруються)."""
+    return Greatest(*[expr if isinstance(expr, Expr) else Col(expr) for expr in exprs])
+
+
+class Query:
+    def __init__(self, steps=()):
+        self.steps = tuple(steps)
+
+    def _then(self, *step):
+        return Query(self.steps + (step,))
+
+    def filter(self, expr):
+        return self._then('filter', expr)
+
+    def select(self, *columns):
+        return self._then('select', list(columns))
+
+    def sample(self, n, seed=None):
+        # Без повторень; якщо рядків менше за n — беруться всі.
+        return self._then('sample', n, seed)
+
+    def strided(self, *steps):
+        """Ділить рядки на len(steps) рівних частин і бере кожен steps[i]-й рядок i-ї частини."""
+        return self._then('strided', steps)
+
+    def aggregate(self, by=None, **aggs):
+        """aggs: назва=(стовпець, функція), функція з AGGREGATIONS; by=None — один рядок."""
+        for name, (_, func) in aggs.items():
+            if func not in AGGREGATIONS:
+                raise ValueError(f"Невідома агрегація {func!r} для {name}")
+        return self._then('aggregate', list(by or []), aggs)
+
+
+def _part_bounds(n, parts):
+    return [n * i // parts for i in range(parts + 1)]
+
+
+class Engine:
+    name = None
+
+    def execute(self, table, query):
+        for step, *args in query.steps:
+            table = getattr(self, step)(table, *args)
+        return table
+
+    def literal(self, value):
+        return value
+
+    def greatest(self, values):
+        return functools.reduce(np.fmax, values)
+
+
+class PandasEngine(Engine):
+    name = 'pandas'
+
+    def prepare(self, frame):
+        return frame
+
+    def column(self, table, name):
+        return table[name]
+
+    def num_rows(self, table):
+        return len(table)
+
+    def to_pandas(self, table):
+        return table
+
+    def filter(self, table, expr):
+        return table[expr.evaluate(self, table).to_numpy(dtype=bool, na_value=False)]
+
+    def select(self, table, columns):
+        return table[columns]
+
+    def sample(self, table, n, seed):
+        return table.sample(n=min(n, len(table)), replace=False, random_state=seed)
+
+    def strided(self, table, steps):
+        bounds = _part_bounds(len(table), len(steps))
+        return pd.concat([table.iloc[bounds[i]:bounds[i + 1]:step] for i, step in enumerate(steps)])
+
+    def aggregate(self, table, by, aggs):
+        if by:
+            return table.groupby(by, observed=True, sort=True).agg(**aggs).reset_index()
+        return pd.DataFrame({name: [table[column].agg(func)] for name, (column, func) in aggs.items()})
+
+
+class ColumnTable:
+    """Типізовані стовпці плюс вектор вибраних рядків (None — усі рядки)."""
+
+    def __init__(self, columns, rows=None):
+        self.columns = columns
+        self.rows = rows
+
+    def __len__(self):
+        if self.rows is not None:
+            return len(self.rows)
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def column(self, name):
+        values = self.columns[name]
+        return values if self.rows is None else values[self.rows]
+
+    def materialize(self):
+        return {name: self.column(name) for name in self.columns}
+
+
+def _group_reduce(func, values, codes, n_groups):
+    # Пропуски не беруть участі; групи без значень отримують NaN (count/nunique — 0).
+    if values.dtype.kind == 'f':
+        valid = ~np.isnan(values)
+        values, codes = values[valid], codes[valid]
+    counts = np.bincount(codes, minlength=n_groups)
+    if func == 'count':
+        return counts
+    if func in ('sum', 'mean'):
+        sums = np.bincount(codes, weights=values, minlength=n_groups)
+        if func == 'sum':
+            return sums
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / counts
+
+    if n_groups == 1:
+        values = np.sort(values)
+    else:
+        # Сортування за значенням, потім стабільне за групою: для малих кодів
+        # numpy бере radix sort, що в рази швидше за lexsort.
+        order = np.argsort(values)
+        small = codes.astype(np.uint16)[order] if n_groups <= np.iinfo(np.uint16).max else codes[order]
+        order = order[np.argsort(small, kind='stable')]
+        values, codes = values[order], codes[order]
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    present = counts > 0
+    if func == 'nunique':
+        new_value = np.r_[True, (values[1:] != values[:-1]) | (codes[1:] != codes[:-1])]
+        return np.bincount(codes[new_value], minlength=n_groups)
+
+    out = np.full(n_groups, np.nan)
+    if not present.any():
+        return out
+    first, last = starts[present], starts[present] + counts[present] - 1
+    if func == 'min':
+        out[present] = values[first]
+    elif func == 'max':
+        out[present] = values[last]
+    elif func == 'median':
+        low = first + (counts[present] - 1) // 2
+        high = first + counts[present] // 2
+        out[present] = (values[low].astype(np.float64) + values[high]) / 2
+    return out
+
+
+class NumpyEngine(Engine):
+    name = 'numpy'
+
+    def prepare(self, frame):
+        columns = {}
+        for name in frame.columns:
+            series = frame[name]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype(series.cat.categories.dtype)
+            values = series.to_numpy()
+            # Рядки без пропусків — у фіксовану ширину '<U': порівняння й сортування
+            # таких масивів у рази швидші, ніж для object.
+            if values.dtype == object and pd.api.types.infer_dtype(values, skipna=False) == 'string':
+                values = values.astype(str)
+            columns[name] = values
+        return ColumnTable(columns)
+
+    def execute(self, table, query):
+        # Відкладене збирання рядків виконується тут, щоб заміри були чесними.
+        table = super().execute(table, query)
+        return ColumnTable(table.materialize()) if table.rows is not None else table
+
+    def column(self, table, name):
+        return table.column(name)
+
+    def num_rows(self, table):
+        return len(table)
+
+    def to_pandas(self, table):
+        return pd.DataFrame(table.materialize())
+
+    def _take(self, table, positions):
+        rows = positions if table.rows is None else table.rows[positions]
+        return ColumnTable(table.columns, rows)
+
+    def filter(self, table, expr):
+        mask = np.asarray(expr.evaluate(self, table), dtype=bool)
+        return self._take(table, np.flatnonzero(mask))
+
+    def select(self, table, columns):
+        return ColumnTable({name: table.columns[name] for name in columns}, table.rows)
+
+    def sample(self, table, n, seed):
+        rng = np.random.default_rng(seed)
+        return self._take(table, rng.choice(len(table), size=min(n, len(table)), replace=False))
+
+    def strided(self, table, steps):
+        bounds = _part_bounds(len(table), len(steps))
+        return self._take(table, np.concatenate([np.arange(bounds[i], bounds[i + 1], step)
+                                                 for i, step in enumerate(steps)]))
+
+    def aggregate(self, table, by, aggs):
+        if by:
+            key_codes, key_values = [], []
+            for key in by:
+                uniques, codes = np.unique(table.column(key), return_inverse=True)
+                key_values.append(uniques)
+                key_codes.append(codes.ravel())
+            shape = tuple(len(values) for values in key_values)
+            combined = np.ravel_multi_index(key_codes, shape) if len(by) > 1 else key_codes[0]
+            groups, codes = np.unique(combined, return_inverse=True)
+            codes = codes.ravel()
+            positions = np.unravel_index(groups, shape)
+            out = {key: key_values[i][positions[i]] for i, key in enumerate(by)}
+            n_groups = len(groups)
+        else:
+            out, n_groups = {}, 1
+            codes = np.zeros(len(table), dtype=np.intp)
+        for name, (column, func) in aggs.items():
+            out[name] = _group_reduce(func, table.column(column), codes, n_groups)
+        return ColumnTable(out)
+
+
+class PolarsEngine(Engine):
+    name = 'polars'
+
+    def prepare(self, frame):
+        import polars as pl
+        return pl.from_pandas(frame)
+
+    def column(self, table, name):
+        import polars as pl
+        return pl.col(name)
+
+    def literal(self, value):
+        import polars as pl
+        return pl.lit(value)
+
+    def greatest(self, values):
+        import polars as pl
+        return pl.max_horizontal(values)
+
+    def num_rows(self, table):
+        return table.height
+
+    def to_pandas(self, table):
+        return table.to_pandas()
+
+    def filter(self, table, expr):
+        return table.filter(expr.evaluate(self, table))
+
+    def select(self, table, columns):
+        return table.select(columns)
+
+    def sample(self, table, n, seed):
+        return table.sample(n=min(n, table.height), with_replacement=False, seed=seed)
+
+    def strided(self, table, steps):
+        import polars as pl
+        bounds = _part_bounds(table.height, len(steps))
+        return pl.concat([table.slice(bounds[i], bounds[i + 1] - bounds[i]).gather_every(step)
+                          for i, step in enumerate(steps)])
+
+    def aggregate(self, table, by, aggs):
+        import polars as pl
+        exprs = []
+        for name, (column, func) in aggs.items():
+            values = pl.col(column).fill_nan(None) if table.schema[column].is_float() else pl.col(column)
+            if func == 'nunique':
+                expr = values.drop_nulls().n_unique()
+            else:
+                expr = getattr(values, func)()
+            exprs.append(expr.alias(name))
+        if by:
+            return table.group_by(by).agg(exprs).sort(by)
+        return table.select(exprs)
+
+
+ENGINES = {engine.name: engine for engine in (PandasEngine(), NumpyEngine(), PolarsEngine())}
+
+
+def available_engines():
+    return [name for name in ENGINES if name != 'polars' or importlib.util.find_spec('polars')]
+
+
+class Dataset:
+    def __init__(self, frame):
+        self.frame = frame
+        self._tables = {}
+
+    def table(self, engine=None):
+        name = engine or DEFAULT_ENGINE
+        if name not in self._tables:
+            self._tables[name] = ENGINES[name].prepare(self.frame)
+        return self._tables[name]
+
+    def run(self, query, engine=None):
+        """Результат у рідному для рушія представленні."""
+        name = engine or DEFAULT_ENGINE
+        return ENGINES[name].execute(self.table(name), query)
+
+    def collect(self, query, engine=None):
+        name = engine or DEFAULT_ENGINE
+        return ENGINES[name].to_pandas(self.run(query, name))
+
+
+def benchmark(dataset, queries, engines=None, repeat=3):
+    """Однаковий замір для всіх рушіїв: мінімальний час із repeat запусків, без підготовки даних."""
+    results = []
+    for engine in engines or available_engines():
+        dataset.table(engine)
+        for name, query in queries.items():
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter_ns()
+                table = dataset.run(query, engine)
+                elapsed = time.perf_counter_ns() - start
+                record_time(f'dataset.{engine}.{name}', elapsed)
+                best = elapsed if best is None else min(best, elapsed)
+            results.append({'query': name, 'engine': engine, 'seconds': best / 1e9,
+                            'rows': ENGINES[engine].num_rows(table)})
+    return results
+
+
+def fastest(results):
+    best = {}
+    for result in results:
+        current = best.get(result['query'])
+        if current is None or result['seconds'] < current['seconds']:
+            best[result['query']] = result
+    return {name: result['engine'] for name, result in best.items()}
@@ -0,0 +1,319 @@
+"""
+Локальний сервер наборів даних у спільній пам'яті.
+
+Сервер один раз завантажує фрейм і куб VHI та буфери сигналів для lab5AD3.0
+і кладе кожен масив в окремий блок multiprocessing.shared_memory. Опис блоків
+(імена, dtype, форми, метадані) записується в JSON-маніфест у тимчасовій
+теці, а номер версії — у маленький блок-лічильник. Воркери Streamlit і Dash
+підключаються через DatasetClient і отримують numpy-представлення прямо над
+спільною пам'яттю, без копій, тож пам'ять не росте з кількістю воркерів.
+
+При зміні вихідних файлів сервер публікує нові блоки, оновлює маніфест і
+збільшує лічильник; клієнт бачить нову версію через refresh(). Старі блоки
+знищуються після паузи: вже відображені в процеси сторінки лишаються
+дійсними, доки клієнт їх не відпустить.
+
+Приклад:
+    python dataset_server.py --csv-dir csvfiles
+    python dataset_server.py --store vhi_store --poll 10
+"""
+
+import argparse
+import glob
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+DEFAULT_PREFIX = 'adlabs'
+SIGNAL_FS = 500
+
+
+def manifest_path(prefix=DEFAULT_PREFIX):
+    return os.path.join(tempfile.gettempdir(), f'{prefix}_datasets.json')
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        # До Python 3.13 трекер ресурсів знищив би чужий блок при виході клієнта.
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def frame_to_arrays(df):
+    """DataFrame -> (масиви, метадані): категорії — коди + список категорій, рядки — '<U'."""
+    import pandas as pd
+
+    arrays, meta = {}, {'columns': list(df.columns), 'categories': {}}
+    for name in df.columns:
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            arrays[name] = series.cat.codes.to_numpy()
+            meta['categories'][name] = series.cat.categories.tolist()
+            continue
+        values = series.to_numpy()
+        if values.dtype == object:
+            values = values.astype(str)
+        arrays[name] = values
+    return arrays, meta
+
+
+def arrays_to_frame(arrays, meta):
+    import pandas as pd
+
+    columns = {}
+    for name in meta['columns']:
+        values = arrays[name]
+        if name in meta['categories']:
+            values = pd.Categorical.from_codes(values, categories=meta['categories'][name])
+        columns[name] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def signal_buffers(fs=SIGNAL_FS):
+    """Вісь часу для lab5AD3.0; шум застосунок генерує сам на кожен виклик."""
+    return {'t': np.linspace(0, 1, fs, endpoint=False)}
+
+
+def load_vhi(csv_dir=None, store_root=None):
+    import pandas as pd
+    from vhi_cube import add_dates
+    from vhi_ingest import VhiStore, parse_file
+    from vhi_regions import PROVINCES
+
+    if store_root:
+        df = VhiStore(store_root).read(['UKR'])
+    else:
+        latest = {}
+        for path in sorted(glob.glob(os.path.join(csv_dir, 'vhi_id_*.csv'))):
+            try:
+                latest[int(os.path.basename(path).split('_')[2].split('.')[0])] = path
+            except (IndexError, ValueError):
+                continue
+        frames = [parse_file(path, province_id) for province_id, path in sorted(latest.items())]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if not df.empty:
+            mapping = PROVINCES['UKR']
+            df['province'] = pd.Categorical(df['provinceid'].map(mapping), categories=list(mapping.values()))
+    return add_dates(df) if not df.empty else df
+
+
+def source_stamp(csv_dir=None, store_root=None):
+    pattern = (os.path.join(store_root, '**', '*.pkl') if store_root
+               else os.path.join(csv_dir, 'vhi_id_*.csv'))
+    paths = glob.glob(pattern, recursive=True)
+    return len(paths), max((os.path.getmtime(path) for path in paths), default=0)
+
+
+class DatasetServer:
+    def __init__(self, prefix=DEFAULT_PREFIX, grace=60.0):
+        self.prefix = prefix
+        self.grace = grace
+        self.version = 0
+        self.datasets = {}
+        self._blocks = {}
+        self._retired = []
+        self._block_prefix = f'{prefix}{os.getpid()}'
+        self._counter = self._create(f'{self._block_prefix}_v', 8)
+        self.counter = np.ndarray((1,), dtype=np.int64, buffer=self._counter.buf)
+        self.counter[0] = 0
+
+    def _create(self, name, size):
+        try:
+            return shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+        except FileExistsError:
+            # Залишок від аварійно завершеного сервера з тим самим pid.
+            _attach(name).unlink()
+            return shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+
+    def publish(self, name, arrays, meta=None):
+        version = self.version + 1
+        blocks, specs = [], {}
+        for i, (key, values) in enumerate(arrays.items()):
+            values = np.ascontiguousarray(values)
+            shm = self._create(f'{self._block_prefix}_{version}_{i}', values.nbytes)
+            np.ndarray(values.shape, values.dtype, buffer=shm.buf)[...] = values
+            blocks.append(shm)
+            specs[key] = {'block': shm.name, 'dtype': values.dtype.str, 'shape': list(values.shape)}
+
+        self.version = version
+        self.datasets[name] = {'version': version, 'arrays': specs, 'meta': meta or {}}
+        old = self._blocks.pop(name, None)
+        self._blocks[name] = blocks
+        self._write_manifest()
+        self.counter[0] = version
+        if old:
+            self._retired.append((time.monotonic() + self.grace, old))
+        self.collect_garbage()
+
+    def _write_manifest(self):
+        path = manifest_path(self.prefix)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'pid': os.getpid(), 'counter': self._counter.name,
+                       'datasets': self.datasets}, f)
+        os.replace(tmp_path, path)
+
+    def collect_garbage(self, force=False):
+        now = time.monotonic()
+        keep = []
+        for deadline, blocks in self._retired:
+            if force or deadline <= now:
+                for shm in blocks:
+                    shm.close()
+                    shm.unlink()
+            else:
+                keep.append((deadline, blocks))
+        self._retired = keep
+
+    def close(self):
+        try:
+            os.remove(manifest_path(self.prefix))
+        except FileNotFoundError:
+            pass
+        self.collect_garbage(force=True)
+        for blocks in self._blocks.values():
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+        self._blocks.clear()
+        del self.counter
+        self._counter.close()
+        self._counter.unlink()
+
+
+class DatasetClient:
+    def __init__(self, manifest, prefix=DEFAULT_PREFIX):
+        self.prefix = prefix
+        self._lock = threading.RLock()
+        self._manifest = manifest
+        self._counter = _attach(manifest['counter'])
+        self._version_view = np.ndarray((1,), dtype=np.int64, buffer=self._counter.buf)
+        self._attached = {}
+        self._stale = []
+        self._cache = {}
+
+    @classmethod
+    def connect(cls, prefix=DEFAULT_PREFIX):
+        """Клієнт або None, якщо сервер не запущено."""
+        try:
+            with open(manifest_path(prefix), encoding='utf-8') as f:
+                manifest = json.load(f)
+            return cls(manifest, prefix)
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    @property
+    def version(self):
+        return int(self._version_view[0])
+
+    def names(self):
+        return list(self._manifest['datasets'])
+
+    def refresh(self):
+        """Перечитує маніфест, якщо сервер опублікував нову версію; True — якщо дані змінились."""
+        with self._lock:
+            if self.version == self._manifest['version']:
+                return False
+            with open(manifest_path(self.prefix), encoding='utf-8') as f:
+                self._manifest = json.load(f)
+            live = {spec['block'] for entry in self._manifest['datasets'].values()
+                    for spec in entry['arrays'].values()}
+            for block in list(self._attached):
+                if block not in live:
+                    self._stale.append(self._attached.pop(block))
+            self._cache = {name: cached for name, cached in self._cache.items()
+                           if cached[0] == self._manifest['datasets'].get(name, {}).get('version')}
+            self.release_stale()
+            return True
+
+    def release_stale(self):
+        # Блок можна закрити лише коли на нього не лишилось numpy-представлень.
+        keep = []
+        for shm in self._stale:
+            try:
+                shm.close()
+            except BufferError:
+                keep.append(shm)
+        self._stale = keep
+
+    def get(self, name):
+        """(словник масивів лише для читання, метадані) набору name."""
+        with self._lock:
+            entry = self._manifest['datasets'][name]
+            cached = self._cache.get(name)
+            if cached and cached[0] == entry['version']:
+                return cached[1], cached[2]
+            arrays = {}
+            for key, spec in entry['arrays'].items():
+                shm = self._attached.get(spec['block'])
+                if shm is None:
+                    shm = self._attached[spec['block']] = _attach(spec['block'])
+                values = np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']), buffer=shm.buf)
+                values.flags.writeable = False
+                arrays[key] = values
+            self._cache[name] = (entry['version'], arrays, entry['meta'])
+            return arrays, entry['meta']
+
+    def frame(self, name):
+        return arrays_to_frame(*self.get(name))
+
+    def cube(self, name='vhi_cube'):
+        from vhi_cube import VhiCube
+
+        arrays, _ = self.get(name)
+        arrays = dict(arrays)
+        return VhiCube.from_arrays(arrays.pop('provinces'), arrays.pop('years'), arrays)
+
+
+def publish_vhi(server, csv_dir=None, store_root=None):
+    from vhi_cube import VhiCube
+
+    df = load_vhi(csv_dir, store_root)
+    if df.empty:
+        print("Немає даних VHI для публікації.")
+        return
+    server.publish('vhi', *frame_to_arrays(df))
+    server.publish('vhi_cube', VhiCube(df).to_arrays())
+    print(f"Опубліковано VHI: {len(df)} рядків, версія {server.version}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сервер наборів даних у спільній пам'яті")
+    parser.add_argument('--csv-dir', default='csvfiles')
+    parser.add_argument('--store', help="коренева тека VhiStore (замість --csv-dir)")
+    parser.add_argument('--prefix', default=DEFAULT_PREFIX)
+    parser.add_argument('--poll', type=float, default=5.0, help="період перевірки нових даних, с")
+    args = parser.parse_args()
+
+    server = DatasetServer(args.prefix)
+    # SIGTERM теж має пройти через finally, інакше блоки лишаться в /dev/shm.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.publish('signals', signal_buffers())
+        stamp = source_stamp(args.csv_dir, args.store)
+        publish_vhi(server, args.csv_dir, args.store)
+        while True:
+            time.sleep(args.poll)
+            current = source_stamp(args.csv_dir, args.store)
+            if current != stamp:
+                stamp = current
+                publish_vhi(server, args.csv_dir, args.store)
+            server.collect_garbage()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Стабільні хеші вхідних даних.
+
+data_digest доповнює sha256 вмістом фрейму, ряду, масиву або вкладених
+list/tuple/dict: для pandas — hash_pandas_object з індексом, для numpy —
+dtype, форма і байти. Використовується як ключ кешу рендерингу (render_cache)
+і як версія джерела даних (vhi_query.FrameSource); модуль не тягне ні
+matplotlib, ні пулу процесів.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def data_digest(data, hasher=None):
+    hasher = hasher or hashlib.sha256()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        hasher.update(repr(list(data.columns) if isinstance(data, pd.DataFrame) else data.name).encode())
+        hasher.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    elif isinstance(data, np.ndarray):
+        hasher.update(repr((data.dtype.str, data.shape)).encode())
+        hasher.update(np.ascontiguousarray(data).tobytes())
+    elif isinstance(data, (list, tuple)):
+        for item in data:
+            data_digest(item, hasher)
+    elif isinstance(data, dict):
+        for key in sorted(data):
+            hasher.update(repr(key).encode())
+            data_digest(data[key], hasher)
+    else:
+        hasher.update(repr(data).encode())
+    return hasher
@@ -0,0 +1,242 @@
+"""
+Стійка черга завантажень з повторами, обмеженням частоти та відновленням.
+
+Завдання (ключ, URL, файл) зберігаються в SQLite у межах запуску run_id, тож
+перерваний запуск продовжується з того ж місця: готові файли не качаються
+вдруге, а завдання, що виконувались у момент падіння, повертаються в чергу.
+Невдалі спроби повторюються з експоненційною затримкою і джитером (з
+урахуванням Retry-After), частоту запитів до NOAA обмежує token bucket.
+Параметр deadline обмежує загальний час запуску: після нього нові спроби не
+починаються, а незавершені завдання лишаються в черзі до наступного запуску.
+Кожна спроба записується з тривалістю й помилкою для звіту по областях.
+
+Приклад:
+    queue = DownloadQueue('raw/downloads.sqlite')
+    queue.enqueue('20250101', [('UKR/Mean/1', url, path), ...])
+    queue.run('20250101', rate=2, deadline=600)
+    print(format_report(queue.report('20250101')))
+"""
+
+import http.client
+import os
+import random
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from instrument import count, record_time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at REAL,
+    PRIMARY KEY (run_id, key)
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    run_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    attempt INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    latency_ms REAL NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS attempts_job ON attempts (run_id, key);
+"""
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class DownloadError(Exception):
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_s = (1 - self.tokens) / self.rate
+            time.sleep(wait_s)
+
+
+def _retry_after(headers):
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+def fetch_url(url, path, timeout=30):
+    """Завантажує url у path атомарно; помилки перетворюються на DownloadError."""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            data = response.read()
+    except urllib.error.HTTPError as e:
+        raise DownloadError(f"HTTP {e.code}", e.code in RETRYABLE_STATUS, _retry_after(e.headers)) from e
+    except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+        raise DownloadError(f"{type(e).__name__}: {e}") from e
+    if not data:
+        raise DownloadError("порожня відповідь")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.part'
+    with open(tmp_path, 'wb') as out:
+        out.write(data)
+    os.replace(tmp_path, path)
+
+
+class DownloadQueue:
+    def __init__(self, db_path='downloads.sqlite'):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, run_id, jobs, retry_failed=False):
+        """jobs: ітерабельне (ключ, url, шлях). Для вже відомих завдань оновлюється лише URL незавершених."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO jobs (run_id, key, url, path, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (run_id, key) DO UPDATE SET url = excluded.url WHERE status != 'done'",
+                [(run_id, key, url, path, time.time()) for key, url, path in jobs])
+            if retry_failed:
+                self.conn.execute("UPDATE jobs SET status = 'pending', attempts = 0, next_attempt_at = 0 "
+                                  "WHERE run_id = ? AND status = 'failed'", (run_id,))
+
+    def pending(self, run_id):
+        return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE run_id = ? AND status != 'done'",
+                                 (run_id,)).fetchone()[0]
+
+    def _attempt(self, fetch, bucket, url, path, timeout):
+        bucket.acquire()
+        started = time.time()
+        start_ns = time.perf_counter_ns()
+        try:
+            fetch(url, path, timeout)
+            error = None
+        except DownloadError as e:
+            error = e
+        except Exception as e:
+            error = DownloadError(f"{type(e).__name__}: {e}")
+        elapsed = time.perf_counter_ns() - start_ns
+        record_time('download.latency', elapsed)
+        return started, elapsed / 1e6, error
+
+    def _finish(self, run_id, key, attempt, result, max_attempts, base_delay, max_delay):
+        started, latency_ms, error = result
+        now = time.time()
+        with self.conn:
+            self.conn.execute("INSERT INTO attempts VALUES (?, ?, ?, ?, ?, ?)",
+                              (run_id, key, attempt, started, latency_ms, str(error) if error else None))
+            if error is None:
+                self.conn.execute("UPDATE jobs SET status = 'done', last_error = NULL, updated_at = ? "
+                                  "WHERE run_id = ? AND key = ?", (now, run_id, key))
+                return
+            count('download.errors')
+            if not error.retryable or attempt >= max_attempts:
+                count('download.failures')
+                self.conn.execute("UPDATE jobs SET status = 'failed', last_error = ?, updated_at = ? "
+                                  "WHERE run_id = ? AND key = ?", (str(error), now, run_id, key))
+                return
+            # Експоненційна затримка з джитером, але не раніше, ніж просить сервер.
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            if error.retry_after is not None:
+                delay = max(delay, min(error.retry_after, max_delay))
+            self.conn.execute("UPDATE jobs SET status = 'pending', next_attempt_at = ?, last_error = ?, "
+                              "updated_at = ? WHERE run_id = ? AND key = ?",
+                              (now + delay, str(error), now, run_id, key))
+
+    def run(self, run_id, fetch=fetch_url, workers=4, rate=2.0, burst=None, max_attempts=5,
+            base_delay=1.0, max_delay=60.0, timeout=30, deadline=None):
+        """Виконує завдання запуску; повертає кількість незавершених (pending/failed) завдань."""
+        with self.conn:
+            # Завдання, що виконувались, коли процес упав, повертаються в чергу.
+            self.conn.execute("UPDATE jobs SET status = 'pending' WHERE run_id = ? AND status = 'running'",
+                              (run_id,))
+        bucket = TokenBucket(rate, burst)
+        stop_at = time.monotonic() + deadline if deadline else None
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                expired = stop_at is not None and time.monotonic() >= stop_at
+                free = workers - len(in_flight)
+                if free and not expired:
+                    rows = self.conn.execute(
+                        "SELECT key, url, path, attempts FROM jobs WHERE run_id = ? AND status = 'pending' "
+                        "AND next_attempt_at <= ? ORDER BY next_attempt_at, key LIMIT ?",
+                        (run_id, time.time(), free)).fetchall()
+                    with self.conn:
+                        for key, url, path, attempts in rows:
+                            self.conn.execute("UPDATE jobs SET status = 'running', attempts = ?, updated_at = ? "
+                                              "WHERE run_id = ? AND key = ?",
+                                              (attempts + 1, time.time(), run_id, key))
+                            future = pool.submit(self._attempt, fetch, bucket, url, path, timeout)
+                            in_flight[future] = (key, attempts + 1)
+
+                if not in_flight:
+                    next_due = self.conn.execute(
+                        "SELECT MIN(next_attempt_at) FROM jobs WHERE run_id = ? AND status = 'pending'",
+                        (run_id,)).fetchone()[0]
+                    if next_due is None or expired:
+                        break
+                    pause = max(0.0, next_due - time.time())
+                    if stop_at is not None:
+                        pause = min(pause, max(0.0, stop_at - time.monotonic()))
+                    time.sleep(pause)
+                    continue
+
+                done, _ = wait(in_flight, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, attempt = in_flight.pop(future)
+                    self._finish(run_id, key, attempt, future.result(), max_attempts, base_delay, max_delay)
+        return self.pending(run_id)
+
+    def report(self, run_id):
+        rows = self.conn.execute(
+            "SELECT j.key, j.status, j.attempts, COUNT(a.attempt), AVG(a.latency_ms), MAX(a.latency_ms), "
+            "SUM(a.error IS NOT NULL), j.last_error "
+            "FROM jobs j LEFT JOIN attempts a ON a.run_id = j.run_id AND a.key = j.key "
+            "WHERE j.run_id = ? GROUP BY j.key ORDER BY j.rowid", (run_id,)).fetchall()
+        columns = ('key', 'status', 'attempts', 'requests', 'mean_latency_ms', 'max_latency_ms',
+                   'errors', 'last_error')
+        return [dict(zip(columns, row)) for row in rows]
+
+
+def format_report(rows):
+    lines = [f"{'Завдання':<16} {'Стан':<8} {'Спроб':>5} {'Помилок':>7} {'Серед., мс':>10} {'Макс., мс':>10}  Остання помилка"]
+    for row in rows:
+        mean = f"{row['mean_latency_ms']:.0f}" if row['mean_latency_ms'] is not None else '-'
+        peak = f"{row['max_latency_ms']:.0f}" if row['max_latency_ms'] is not None else '-'
+        lines.append(f"{row['key']:<16} {row['status']:<8} {row['attempts']:>5} {row['errors'] or 0:>7} "
+                     f"{mean:>10} {peak:>10}  {row['last_error'] or ''}")
+    by_status = {}
+    for row in rows:
+        by_status[row['status']] = by_status.get(row['status'], 0) + 1
+    lines.append("Разом: " + ", ".join(f"{status}: {n}" for status, n in sorted(by_status.items())))
+    return "\n".join(lines)
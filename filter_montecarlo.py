@@ -0,0 +1,156 @@
+"""
+Монте-Карло оцінка стійкості фільтрів lab5AD2.0 до шуму.
+
+Одна реалізація шуму (stored_noise у lab5AD2.0) дає випадкову MSE, тож
+порівняння типів фільтрів за нею саме по собі шумне. Тут MSE рахується для
+N незалежних реалізацій: кожен пакет отримує власний потік випадкових чисел
+від SeedSequence.spawn, тож результат не залежить від кількості процесів, а
+пакети фільтруються векторно (filtfilt по axis=1) у пулі процесів.
+
+filtfilt лінійний, тому для шуму noise_mean + sqrt(cov) * Z
+    filtfilt(clean + noise) - clean = d + sqrt(cov) * filtfilt(Z),
+де d = filtfilt(clean + noise_mean) - clean не залежить від реалізації.
+Кожен пакет фільтрує Z один раз на тип фільтра, а MSE для будь-якої
+кількості коваріацій виходить з двох сум по рядках:
+    MSE = mean(d²) + 2·sqrt(cov)·mean(d·fZ) + cov·mean(fZ²).
+Для всіх фільтрів і коваріацій використовуються ті самі Z (спільні випадкові
+числа), тож різниця між фільтрами оцінюється точніше, ніж за окремих вибірок.
+
+Приклад:
+    python filter_montecarlo.py -n 100000 --covariances 0.05 0.1 0.5
+    python filter_montecarlo.py -n 20000 --filters butterworth elliptic --output mc.json
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from instrument import timed
+
+FILTER_TYPES = ('butterworth', 'chebyshev', 'bessel', 'elliptic')
+
+# Ті самі значення, що й start_params та t у lab5AD2.0.
+SIGNAL_PARAMS = {'amplitude': 1.0, 'frequency': 0.3, 'phase': 0.0, 'noise_mean': 0.0}
+T = np.linspace(0, 10, 1000)
+FS = 100
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def design_filter(filter_type, cutoff, order, fs=FS):
+    """Коефіцієнти (b, a) низькочастотного фільтра; невідомий тип — Баттерворт."""
+    from scipy.signal import bessel, butter, cheby1, iirfilter
+
+    normal_cutoff = cutoff / (0.5 * fs)
+    if filter_type == "chebyshev":
+        return cheby1(order, 1.0, normal_cutoff, btype='low', analog=False)
+    if filter_type == "bessel":
+        return bessel(order, normal_cutoff, btype='low', analog=False)
+    if filter_type == "elliptic":
+        return iirfilter(order, normal_cutoff, btype='low', ftype='ellip', rp=1, rs=60, analog=False)
+    return butter(order, normal_cutoff, btype='low', analog=False)
+
+
+def _run_batch(job):
+    # Виконується у воркері: повертає лише суми по рядках, а не самі сигнали.
+    from scipy.signal import filtfilt
+
+    seed, size, n_samples, bias, coefficients = job
+    noise = np.random.default_rng(seed).standard_normal((size, n_samples))
+    stats = {}
+    for filter_type, (b, a) in coefficients.items():
+        filtered = filtfilt(b, a, noise, axis=1)
+        stats[filter_type] = ((filtered @ bias[filter_type]) / n_samples,
+                              np.einsum('ij,ij->i', filtered, filtered) / n_samples)
+    return stats
+
+
+def summarize(mse, confidence=0.95):
+    mean = float(mse.mean())
+    std = float(mse.std(ddof=1)) if len(mse) > 1 else 0.0
+    half_width = NormalDist().inv_cdf((1 + confidence) / 2) * std / np.sqrt(len(mse))
+    summary = {'n': len(mse), 'mean': mean, 'std': std,
+               'ci_low': mean - half_width, 'ci_high': mean + half_width}
+    for q, value in zip(PERCENTILES, np.percentile(mse, PERCENTILES)):
+        summary[f'p{q}'] = float(value)
+    return summary
+
+
+@timed('filter_mc.study')
+def run_study(n_realisations=100_000, filter_types=FILTER_TYPES, covariances=(0.1,), cutoff=5.0, order=5,
+              t=T, fs=FS, batch_size=2000, workers=None, seed=0, confidence=0.95, **signal_params):
+    """Повертає {'results': [зведення по (фільтр, коваріація)], 'params': ...}."""
+    from scipy.signal import filtfilt
+
+    params = dict(SIGNAL_PARAMS, **signal_params)
+    clean = params['amplitude'] * np.sin(2 * np.pi * params['frequency'] * t + params['phase'])
+    coefficients = {name: design_filter(name, cutoff, order, fs) for name in filter_types}
+    bias = {name: filtfilt(b, a, clean + params['noise_mean']) - clean for name, (b, a) in coefficients.items()}
+
+    sizes = [batch_size] * (n_realisations // batch_size)
+    if n_realisations % batch_size:
+        sizes.append(n_realisations % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(child, size, len(t), bias, coefficients) for child, size in zip(seeds, sizes)]
+
+    if workers == 0:
+        batches = list(map(_run_batch, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(_run_batch, jobs))
+    cross = {name: [stats[name][0] for stats in batches] for name in filter_types}
+    power = {name: [stats[name][1] for stats in batches] for name in filter_types}
+
+    results = []
+    for cov in covariances:
+        scale = np.sqrt(cov)
+        mse = {name: np.mean(bias[name] ** 2) + 2 * scale * np.concatenate(cross[name])
+               + cov * np.concatenate(power[name]) for name in filter_types}
+        # Частка реалізацій, у яких фільтр дав найменшу MSE (на тих самих Z).
+        wins = np.bincount(np.argmin(np.stack([mse[name] for name in filter_types]), axis=0),
+                           minlength=len(filter_types)) / n_realisations
+        for i, name in enumerate(filter_types):
+            results.append(dict(filter=name, covariance=cov, win_rate=float(wins[i]),
+                                **summarize(mse[name], confidence)))
+    return {'results': results,
+            'params': dict(params, n_realisations=n_realisations, cutoff=cutoff, order=order, fs=fs,
+                           seed=seed, confidence=confidence)}
+
+
+def format_study(study):
+    confidence = study['params']['confidence']
+    lines = [f"{'Фільтр':<12} {'Коваріація':>10} {'Середня MSE':>12} {f'ДІ {confidence:.0%}':>23} "
+             f"{'p5':>9} {'p50':>9} {'p95':>9} {'Найкращий':>9}"]
+    for row in study['results']:
+        ci = f"[{row['ci_low']:.5f}, {row['ci_high']:.5f}]"
+        lines.append(f"{row['filter']:<12} {row['covariance']:>10.3f} {row['mean']:>12.5f} {ci:>23} "
+                     f"{row['p5']:>9.5f} {row['p50']:>9.5f} {row['p95']:>9.5f} {row['win_rate']:>9.1%}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Монте-Карло порівняння фільтрів за MSE")
+    parser.add_argument('-n', '--realisations', type=int, default=100_000)
+    parser.add_argument('--filters', nargs='+', default=list(FILTER_TYPES), choices=FILTER_TYPES)
+    parser.add_argument('--covariances', nargs='+', type=float, default=[0.1])
+    parser.add_argument('--cutoff', type=float, default=5.0)
+    parser.add_argument('--order', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=2000)
+    parser.add_argument('--workers', type=int, help="0 — без пулу процесів")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="зберегти результати у JSON")
+    args = parser.parse_args()
+
+    study = run_study(args.realisations, args.filters, args.covariances, args.cutoff, args.order,
+                      batch_size=args.batch_size, workers=args.workers, seed=args.seed)
+    print(format_study(study))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(study, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Легка інструментація гарячих шляхів: таймери, лічильники, знімки пам'яті.
+
+    with timer('vhi.read'):
+        ...
+
+    @timed('vhi.download')
+    def download(...): ...
+
+Час міряється через perf_counter_ns і накопичується в спільному реєстрі
+(кількість, сума, максимум), який можна надрукувати (report) або вивантажити
+у текстовому форматі Prometheus (export_prometheus). Профілювання вмикається
+лише явно: змінна середовища ADLABS_PROFILE=cprofile|pyinstrument і
+setup_from_env() у точці входу. ADLABS_METRICS=<файл> записує метрики при
+завершенні процесу.
+"""
+
+import atexit
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_timers = {}
+_counters = {}
+_gauges = {}
+
+
+def record_time(name, elapsed_ns):
+    with _lock:
+        stats = _timers.setdefault(name, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += elapsed_ns
+        stats[2] = max(stats[2], elapsed_ns)
+
+
+@contextmanager
+def timer(name):
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record_time(name, time.perf_counter_ns() - start)
+
+
+def timed(name=None):
+    def decorator(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def memory_snapshot(label):
+    # Якщо tracemalloc увімкнено — поточна і пікова пам'ять Python-об'єктів,
+    # інакше максимальний RSS процесу (де він доступний).
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        gauge(f'memory.{label}.current_bytes', current)
+        gauge(f'memory.{label}.peak_bytes', peak)
+        return current
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    gauge(f'memory.{label}.max_rss_bytes', rss)
+    return rss
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _gauges.clear()
+
+
+def snapshot():
+    with _lock:
+        return ({name: tuple(stats) for name, stats in _timers.items()},
+                dict(_counters), dict(_gauges))
+
+
+def report():
+    timers, counters, gauges = snapshot()
+    lines = []
+    for name, (n, total, peak) in sorted(timers.items()):
+        lines.append(f"{name}: {n} викл., всього {total / 1e6:.2f} мс, "
+                     f"серед. {total / n / 1e6:.3f} мс, макс {peak / 1e6:.3f} мс")
+    for name, value in sorted(counters.items()):
+        lines.append(f"{name}: {value}")
+    for name, value in sorted(gauges.items()):
+        lines.append(f"{name} = {value}")
+    return "\n".join(lines)
+
+
+def _label(name):
+    return name.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def export_prometheus(prefix='adlabs'):
+    timers, counters, gauges = snapshot()
+    lines = [f"# TYPE {prefix}_duration_seconds summary"]
+    for name, (n, total, _) in sorted(timers.items()):
+        lines.append(f'{prefix}_duration_seconds_count{{name="{_label(name)}"}} {n}')
+        lines.append(f'{prefix}_duration_seconds_sum{{name="{_label(name)}"}} {total / 1e9:.9f}')
+    lines.append(f"# TYPE {prefix}_duration_seconds_max gauge")
+    for name, (_, _, peak) in sorted(timers.items()):
+        lines.append(f'{prefix}_duration_seconds_max{{name="{_label(name)}"}} {peak / 1e9:.9f}')
+    lines.append(f"# TYPE {prefix}_events_total counter")
+    for name, value in sorted(counters.items()):
+        lines.append(f'{prefix}_events_total{{name="{_label(name)}"}} {value}')
+    lines.append(f"# TYPE {prefix}_value gauge")
+    for name, value in sorted(gauges.items()):
+        lines.append(f'{prefix}_value{{name="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, prefix='adlabs'):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(export_prometheus(prefix))
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def profile(name, engine='cprofile', directory='.'):
+    os.makedirs(directory, exist_ok=True)
+    if engine == 'pyinstrument':
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            with open(os.path.join(directory, f'{name}.html'), 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(directory, f'{name}.prof'))
+
+
+_active_profile = None
+_metrics_registered = False
+
+
+def setup_from_env(name):
+    global _active_profile, _metrics_registered
+    engine = os.environ.get('ADLABS_PROFILE')
+    if engine and _active_profile is None:
+        _active_profile = profile(name, engine, os.environ.get('ADLABS_PROFILE_DIR', 'profiles'))
+        _active_profile.__enter__()
+        atexit.register(_active_profile.__exit__, None, None, None)
+    metrics_path = os.environ.get('ADLABS_METRICS')
+    if metrics_path and not _metrics_registered:
+        _metrics_registered = True
+        atexit.register(write_prometheus, metrics_path)
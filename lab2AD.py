@@ -1,84 +1,74 @@
-import urllib.request 
-import pandas as pd
 import os
 from datetime import datetime
+from vhi_regions import PROVINCES
+from instrument import count, memory_snapshot, setup_from_env, timed
 
-def download_vhi_data(province_id, start_year=1981, end_year=2024):
-    url = f"https://www.star.nesdis.noaa.gov/smcd/emb/vci/VH/get_TS_admin.php?country=UKR&provinceID={province_id}&year1={start_year}&year2={end_year}&type=Mean"
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f'vhi_id_{province_id}_{timestamp}.csv'
-    if os.path.exists(filename):
-        print(f"Файл для області {province_id} вже існує: {filename}. Пропускаємо завантаження.")
-        return
-    
-    try:
-        vhi_url = urllib.request.urlopen(url)
-        with open(filename, 'wb') as out:
-            out.write(vhi_url.read())
-        print(f"VHI дата для області {province_id} завантажена і збережена як {filename}")
-    except Exception as e:
-        print(f"Помилка для області {province_id}: {e}")
+# Словник
+province_mapping = PROVINCES['UKR']
 
-for province_id in range(1, 26):  
-    download_vhi_data(province_id)
+@timed('vhi.download')
+def download_vhi_data(province_ids, start_year=1981, end_year=2024, country='UKR', series_type='Mean',
+                      base_url=None, deadline=None):
+    # Черга в downloads.sqlite: повторний запуск того ж дня докачує лише те,
+    # що не вдалося, а невдалі області видно у звіті, а не губляться.
+    from download_queue import DownloadQueue, format_report
+    from vhi_ingest import BASE_URL, build_url
 
+    run_id = datetime.now().strftime("%Y%m%d")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    jobs = [(f"{country}/{series_type}/{province_id}",
+             build_url(country, province_id, start_year, end_year, series_type, base_url or BASE_URL),
+             f'vhi_id_{province_id}_{timestamp}.csv') for province_id in province_ids]
+    queue = DownloadQueue('downloads.sqlite')
+    try:
+        queue.enqueue(run_id, jobs)
+        unfinished = queue.run(run_id, deadline=deadline)
+        print(format_report(queue.report(run_id)))
+    finally:
+        queue.close()
+    if unfinished:
+        count('vhi.download.errors', unfinished)
+        print(f"Не завантажено {unfinished} файл(ів); повторний запуск сьогодні продовжить чергу.")
+
+@timed('vhi.read')
 def read_vhi_data(directory):
-    data_frames = []
+    import pandas as pd
+    from validation import format_validation
+    from vhi_schema import parse_vhi_csv
+
+    data_frames, reports = [], []
     for filename in os.listdir(directory):
         if filename.startswith('vhi_id_') and filename.endswith('.csv'):
             filepath = os.path.join(directory, filename)
             try:
                 province_id = int(filename.split('_')[2])
             except (IndexError, ValueError) as e:
-                print(f"Невірний формат імені файлу: {filename}. Видаляємо цей файл.")
-                os.remove(filepath) 
+                print(f"Невірний формат імені файлу: {filename}. Пропускаємо цей файл.")
+                count('vhi.read.bad_filenames')
                 continue
-            df = pd.read_csv(filepath, index_col=False, header=1)
-            df['provinceID'] = province_id  
-            
-            data_frames.append(df)    
+            # Розбір і перевірка за один прохід: погані рядки йдуть у quarantine/.
+            df, report = parse_vhi_csv(filepath, province_id, os.path.join(directory, 'quarantine'))
+            data_frames.append(df)
+            reports.append(report)
+    print(format_validation(reports))
     return pd.concat(data_frames, ignore_index=True)
 
-data_directory = '.' 
-vhi_data = read_vhi_data(data_directory)
-vhi_data.columns = vhi_data.columns.str.strip().str.replace('<br>', '', regex=True)
-vhi_data['year'] = vhi_data['year'].astype(str).str.extract(r'(\d+)')
-vhi_data = vhi_data.dropna(subset=['year']).copy() 
-vhi_data['year'] = vhi_data['year'].astype(int) 
-print("Стовпці у фреймі:")
-print(vhi_data.columns)
+def analyze_vhi_data(dataset, province, year):
+    from dataset_query import Query, col
 
-# Словник
-province_mapping = {
-    1: "Вінницька", 2: "Волинська", 3: "Дніпропетровська", 4: "Донецька",
-    5: "Житомирська", 6: "Закарпатська", 7: "Запорізька", 8: "Івано-Франківська",
-    9: "Київська", 10: "Кіровоградська", 11: "Луганська", 12: "Львівська",
-    13: "Миколаївська", 14: "Одеська", 15: "Полтавська", 16: "Рівненська",
-    17: "Сумська", 18: "Тернопільська", 19: "Харківська", 20: "Херсонська",
-    21: "Хмельницька", 22: "Черкаська", 23: "Чернівецька", 24: "Чернігівська",
-    25: "Республіка Крим"
-}
-
-def replace_province_indices(df, mapping):
-    if 'provinceID' in df.columns:
-        df['province'] = df['provinceID'].map(mapping) 
-    else:
-        print("Помилка: стовпець 'provinceID' не знайдено у фреймі даних.")
-    return df
-
-vhi_data = replace_province_indices(vhi_data, province_mapping)
-
-def analyze_vhi_data(df, province, year):
-    province_data = df[(df['province'] == province) & (df['year'] == year)]
-    if not province_data.empty:
+    query = Query().filter((col('province') == province) & (col('year') == year)).aggregate(
+        rows=('week', 'count'), min=('vhi', 'min'), max=('vhi', 'max'),
+        mean=('vhi', 'mean'), median=('vhi', 'median'))
+    stats = dataset.collect(query).iloc[0]
+    if stats['rows']:
         print("-"*70)
         print(f"Область: {province}, Рік: {year}")
-        print(f"Мін VHI: {province_data['VHI'].min()}, Макс VHI: {province_data['VHI'].max()}, Серднє: {province_data['VHI'].mean()}, Медіана VHI: {province_data['VHI'].median()}")
+        print(f"Мін VHI: {stats['min']:.2f}, Макс VHI: {stats['max']:.2f}, Серднє: {stats['mean']:.2f}, Медіана VHI: {stats['median']:.2f}")
         print("-"*70)
     else:
         print(f"Нема інформації для {province}обл in {year}")
 
-def user_input_for_analysis(df):
+def user_input_for_analysis(dataset):
     print("Доступні області:")
     for idx, province in province_mapping.items():
         print(f"{idx}: {province}")
@@ -91,11 +81,11 @@ def user_input_for_analysis(df):
         return
     
     province = province_mapping[province_id]
-    analyze_vhi_data(df, province, year)
+    analyze_vhi_data(dataset, province, year)
 
-user_input_for_analysis(vhi_data)
+def display_vhi_for_range(service, page_size=100):
+    from vhi_query import VhiQuery
 
-def display_vhi_for_range(df):
     print("Доступні області:")
     for idx, province in province_mapping.items():
         print(f"{idx}: {province}")
@@ -111,26 +101,34 @@ def display_vhi_for_range(df):
         print(f"Невірні області: {', '.join(map(str, invalid_provinces))}.")
         return
     
-    filtered_data = df[(df['provinceID'].isin(provinces_list)) & 
-                        (df['year'].between(start_year, end_year))]
-
-    year_difference = end_year - start_year
-    row_limit = 52 + (year_difference * 52)
-    
-    if not filtered_data.empty:
-        print("-"*70)
-        for province_id in provinces_list:
-            province_name = province_mapping[province_id]
-            print(f"Ряд VHI для області {province_name} з {start_year} по {end_year}:")
-            province_data = filtered_data[filtered_data['provinceID'] == province_id]
-            province_data_limited = province_data.head(row_limit)
-            print(province_data_limited[['year', 'VHI']].to_string(index=False))
-            print("-"*70)
-    else:
+    query = VhiQuery(regions=provinces_list, years=(start_year, end_year))
+    page = service.run(query, 1, page_size)
+    if not page.total:
         print(f"Немає даних для вказаних областей або років.")
+        return
+
+    # Результат виводиться сторінками; наступні сторінки беруться з кешу запиту.
+    print("-"*70)
+    current = None
+    while True:
+        for row in page.rows.itertuples(index=False):
+            if row.provinceid != current:
+                if current is not None:
+                    print("-"*70)
+                current = row.provinceid
+                print(f"Ряд VHI для області {province_mapping[current]} з {start_year} по {end_year}:")
+                print(f"{'year':>6} {'week':>4} {'vhi':>7}")
+            print(f"{row.year:>6} {row.week:>4} {row.vhi:>7.2f}")
+        print(f"Сторінка {page.number} з {page.pages}")
+        if not page.has_next or input("Enter — наступна сторінка, q — завершити: ").strip().lower() == 'q':
+            break
+        page = service.run(query, page.number + 1, page_size)
+    print("-"*70)
+
+
+def find_extreme_droughts_user_input(dataset, mapping):
+    from dataset_query import Query, col
 
-display_vhi_for_range(vhi_data)
-def find_extreme_droughts_user_input(df, mapping):
     print("\n Аналіз екстремальних посух в Україні ")
     print("=" * 70)
     try:
@@ -147,10 +145,12 @@ def find_extreme_droughts_user_input(df, mapping):
     print(f"\n Шукаємо роки, коли більше {percent_threshold:.1f}% областей (тобто {threshold_regions}+) постраждали від посухи (VHI < 15)...")
     print("=" * 70)
 
+    # Один прохід по даних: пари (рік, область) з хоча б одним тижнем посухи.
+    pairs = dataset.collect(Query().filter(col('vhi') < 15).aggregate(by=['year', 'provinceid'], weeks=('vhi', 'count')))
+
     drought_years = []
-    for year in sorted(df['year'].unique()):
-        year_data = df[df['year'] == year]
-        drought_regions = year_data[year_data['VHI'] < 15]['provinceID'].unique()
+    for year, year_pairs in pairs.groupby('year', sort=True):
+        drought_regions = year_pairs['provinceid'].tolist()
 
         if len(drought_regions) >= threshold_regions:
             affected_regions = [mapping[r] for r in drought_regions if r in mapping]
@@ -169,6 +169,59 @@ def find_extreme_droughts_user_input(df, mapping):
     else:
         print("\n❗ Посухи, що уразили більше зазначеного відсотка областей, не знайдено.")
 
-find_extreme_droughts_user_input(vhi_data, province_mapping)
+@timed('vhi.drought_episodes')
+def print_drought_episodes(df, mapping, threshold=15, min_duration=3, top=10):
+    from vhi_droughts import detect_episodes
+
+    episodes = detect_episodes(df, 'vhi', threshold=threshold, min_duration=min_duration)
+    print(f"\n Епізоди посухи (VHI < {threshold} не менше {min_duration} тижнів поспіль) ")
+    print("=" * 70)
+    if episodes.empty:
+        print("Епізодів не знайдено.")
+        return
+    print(f"Знайдено {len(episodes)} епізод(ів). Найсильніші:")
+    for row in episodes.nlargest(top, 'severity').itertuples(index=False):
+        print(f"{mapping.get(row.provinceid, row.provinceid)}: {row.onset_year} тиж. {row.onset_week} - "
+              f"{row.end_year} тиж. {row.end_week} | {row.duration} тиж. | дефіцит {row.severity:.1f} | "
+              f"мін VHI {row.min_value:.2f} | уражено областей: {row.extent}")
+    print("=" * 70)
+
+@timed('vhi.trends')
+def print_vhi_trends(df, mapping):
+    from vhi_anomaly import ClimatologyEngine
+
+    engine = ClimatologyEngine('vhi').fit(df)
+    latest = engine.anomalies(df.sort_values(['year', 'week']).groupby('provinceid', observed=True).tail(1))
+    trends = engine.trends().merge(latest[['provinceid', 'year', 'week', 'vhi_anomaly', 'vhi_z']], on='provinceid')
+
+    print("\n Тренди та аномалії VHI по областях ")
+    print("=" * 70)
+    for row in trends.itertuples(index=False):
+        print(f"{mapping.get(row.provinceid, row.provinceid)}: тренд {row.slope_per_decade:+.2f} VHI/десятиліття | "
+              f"{row.year} тиж. {row.week}: аномалія {row.vhi_anomaly:+.2f} (z = {row.vhi_z:+.2f})")
+    print("=" * 70)
+
+def main(data_directory='.'):
+    from dataset_query import Dataset
+    from vhi_query import VhiQueryService
+    from vhi_schema import normalize_vhi_frame
+
+    setup_from_env('lab2AD')
+    download_vhi_data(range(1, 26))
+
+    vhi_data = read_vhi_data(data_directory)
+    vhi_data = normalize_vhi_frame(vhi_data, province_mapping)
+    memory_snapshot('vhi_data')
+    print("Стовпці у фреймі:")
+    print(vhi_data.columns)
+    dataset = Dataset(vhi_data)
+
+    user_input_for_analysis(dataset)
+    display_vhi_for_range(VhiQueryService.from_frame(vhi_data))
+    find_extreme_droughts_user_input(dataset, province_mapping)
+    print_drought_episodes(vhi_data, province_mapping)
+    print_vhi_trends(vhi_data, province_mapping)
 
 
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,13 @@
 import os 
-import pandas as pd
-import glob
-import streamlit as st
-import matplotlib.pyplot as plt
-
-st.set_page_config(
-    page_title="VHI Data Analysis", 
-    page_icon=":chart_with_upwards_trend:", 
-    layout="wide"
-)
-
-st.markdown("""
+import functools
+from vhi_regions import PROVINCES
+from instrument import count, memory_snapshot, setup_from_env, timed, timer
+
+# streamlit, pandas, matplotlib та модулі обчислень імпортуються всередині функцій:
+# імпорт модуля нічого не малює і не читає, а важкі залежності
+# завантажуються лише тоді, коли потрібні.
+
+PAGE_CSS = """
 <style>
 .main {
     background-color: #f0f2f6;
@@ -45,24 +42,36 @@ st.markdown("""
     color: white !important;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
 
 DATA_DIR = "csvfiles"
-os.makedirs(DATA_DIR, exist_ok=True)
-
-allreg = {
-    1: "Вінницька", 2: "Волинська", 3: "Дніпропетровська", 4: "Донецька",
-    5: "Житомирська", 6: "Закарпатська", 7: "Запорізька", 8: "Івано-Франківська",
-    9: "Київська", 10: "Кіровоградська", 11: "Луганська", 12: "Львівська",
-    13: "Миколаївська", 14: "Одеська", 15: "Полтавська", 16: "Рівненська",
-    17: "Сумська", 18: "Тернопільська", 19: "Харківська", 20: "Херсонська",
-    21: "Хмельницька", 22: "Черкаська", 23: "Чернівецька", 24: "Чернігівська",
-    25: "Республіка Крим"
-}
+
+allreg = PROVINCES['UKR']
+
+def streamlit_cached(kind='cache_data', **options):
+    # st.cache_data / st.cache_resource застосовуються при першому виклику,
+    # тож для оголошення функцій streamlit не потрібен. Ключ кешу streamlit
+    # будує з імені та коду функції, тому між перезапусками скрипта він той самий.
+    def decorator(func):
+        cached = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal cached
+            if cached is None:
+                import streamlit as st
+                cached = getattr(st, kind)(func, **options)
+            return cached(*args, **kwargs)
+        return wrapper
+    return decorator
 
 def read_vhi_data(directory):
+    import pandas as pd
+    from vhi_schema import parse_vhi_csv
+
     data_frames = []
     if not os.path.exists(directory):
+        import streamlit as st
         st.error(f"Директорія {directory} не існує!")
         return pd.DataFrame()
     
@@ -71,11 +80,11 @@ def read_vhi_data(directory):
             filepath = os.path.join(directory, filename)
             try:
                 province_id = int(filename.split('_')[2].split('.')[0])  
-                df = pd.read_csv(filepath, index_col=False, header=1, delimiter=',')
-                df['provinceID'] = province_id  
+                df, report = parse_vhi_csv(filepath, province_id, os.path.join(directory, 'quarantine'))
                 data_frames.append(df)
+                count('vhi.read.quarantined', report['quarantined'])
             except (IndexError, ValueError) as e:
-                print(f"Невірний формат імені файлу: {filename}. Помилка: {e}")
+                print(f"Невірний формат файлу або його імені: {filename}. Помилка: {e}")
                 continue
             except pd.errors.EmptyDataError:
                 print(f"Файл {filename} порожній або має невірний формат.")
@@ -89,45 +98,154 @@ def read_vhi_data(directory):
         return pd.DataFrame()
     
     try:
-        df_combined = pd.concat(data_frames, ignore_index=True)
-        df_combined.columns = [col.lower().strip().replace('<br>', '') for col in df_combined.columns]
-        
-        return df_combined
+        return pd.concat(data_frames, ignore_index=True)
     except Exception as e:
         print(f"Помилка при об'єднанні даних: {e}")
         return pd.DataFrame()
 
+@timed('vhi.read')
 def read_data_to_dataframe(directory):
+    import pandas as pd
+    from vhi_cube import add_dates
+    from vhi_schema import normalize_vhi_frame
+
     df = read_vhi_data(directory)
     
     if df.empty:
         return pd.DataFrame()
     
-    if 'year' in df.columns:
-        df['year'] = df['year'].astype(str).str.extract(r'(\d+)')
-        df = df.dropna(subset=['year']).copy() 
-        df['year'] = df['year'].astype(int)
-    else:
-        print("Попередження: стовпець 'year' не знайдено")
-    
-    if 'week' in df.columns:
-        df['week'] = df['week'].astype(int)
-    
-    if 'provinceid' in df.columns:
-        df = replace_province_indices(df, allreg)
-    else:
+    if 'year' not in df.columns or 'week' not in df.columns:
+        print("Попередження: стовпці 'year'/'week' не знайдено")
+        return df
+    if 'provinceid' not in df.columns:
         print("Попередження: стовпець 'provinceID' не знайдено")
+        return df
+
+    df = normalize_vhi_frame(df, allreg)
+    memory_snapshot('vhi_data')
+    return add_dates(df)
+
+@streamlit_cached('cache_data')
+def load_data(directory):
+    return read_data_to_dataframe(directory)
+
+# Якщо запущено dataset_server.py, фрейм і куб беруться зі спільної пам'яті
+# (без копії на кожен процес), а номер версії даних входить у ключ кешу:
+# нова публікація на сервері автоматично інвалідовує кеші.
+@streamlit_cached('cache_resource')
+def get_dataset_client():
+    from dataset_server import DatasetClient
+
+    return DatasetClient.connect()
+
+def shared_data_version():
+    client = get_dataset_client()
+    if client is None:
+        return 0
+    client.refresh()
+    return client.version if 'vhi' in client.names() else 0
+
+@streamlit_cached('cache_resource', max_entries=2)
+def load_shared_data(version):
+    return get_dataset_client().frame('vhi')
+
+@streamlit_cached('cache_resource', max_entries=2)
+def get_cube(directory, version=0):
+    from vhi_cube import VhiCube
+
+    if version:
+        return get_dataset_client().cube()
+    return VhiCube(load_data(directory))
+
+@streamlit_cached('cache_resource', max_entries=2)
+def get_aggregates(directory, version=0):
+    from vhi_aggregates import RegionAggregates
+
+    return RegionAggregates(get_cube(directory, version))
+
+# Один сервіс запитів на процес: його LRU-кеш спільний для всіх сесій.
+@streamlit_cached('cache_resource', max_entries=2)
+def get_query_service(directory, version=0):
+    from vhi_query import VhiQueryService
+
+    return VhiQueryService.from_frame(load_shared_data(version) if version else load_data(directory))
+
+STAT_LABELS = {'mean': 'Середнє', 'median': 'Медіана', 'p25': '25-й перцентиль',
+               'p75': '75-й перцентиль', 'drought_weeks': 'Тижнів посухи'}
+
+LEVEL_LABELS = {'auto': 'Авто', 'weekly': 'Тижні', 'monthly': 'Місяці', 'yearly': 'Роки'}
+
+SEASON_LABELS = {None: 'Власний діапазон тижнів', 'winter': 'Зима', 'spring': 'Весна',
+                 'summer': 'Літо', 'autumn': 'Осінь'}
+
+AGG_LABELS = {None: 'Без агрегації', 'mean': 'Середнє', 'median': 'Медіана', 'min': 'Мінімум',
+              'max': 'Максимум', 'count': 'Кількість тижнів'}
+
+GROUP_LABELS = {'province_year': 'Область і рік', 'province': 'Область', 'year': 'Рік',
+                'week': 'Тиждень', 'total': 'Разом'}
+
+@streamlit_cached('cache_resource')
+def get_render_service():
+    from render_cache import RenderService
+
+    return RenderService(workers=0, cache_size=256)
+
+def plot_time_series(series_df, analysis_type, level, names):
+    import matplotlib.pyplot as plt
+
+    plt.style.use('default') 
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for i, (province_id, part) in enumerate(series_df.groupby('provinceid', sort=False)):
+        color = '#3498db' if i == 0 else f"C{i}"
+        ax.plot(part['date'], part['mean'], label=names.get(province_id, str(province_id)), color=color, linewidth=2)
+        if level != 'weekly':
+            ax.fill_between(part['date'], part['min'], part['max'], color=color, alpha=0.2, linewidth=0)
+    ax.set_title(f"{analysis_type.upper()} по роках ({LEVEL_LABELS[level].lower()})", fontsize=15, fontweight='bold')
+    ax.set_xlabel("Дата", fontsize=12)
+    ax.set_ylabel(analysis_type.upper(), fontsize=12)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend()
+    return fig
+
+def plot_region_comparison(compare_stats, analysis_type, stat='mean'):
+    import matplotlib.pyplot as plt
+
+    plt.style.use('default')  
+    fig, ax = plt.subplots(figsize=(12, 6))
+    bars = ax.bar(compare_stats['province'], compare_stats[stat], color='#2ecc71')
+    ax.set_title(f"{STAT_LABELS[stat]} {analysis_type.upper()} по регіонах", fontsize=15, fontweight='bold')
+    ax.set_xlabel("Регіон", fontsize=12)
+    ax.set_ylabel(f"{STAT_LABELS[stat]} {analysis_type.upper()}", fontsize=12)
+    ax.tick_params(axis='x', rotation=90)
     
-    return df
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.2f}', 
+                ha='center', va='bottom', fontsize=9)
+    return fig
+
+def setup_page():
+    import streamlit as st
 
-def replace_province_indices(df, mapping):
-    df['province'] = df['provinceid'].map(mapping)
-    return df
+    st.set_page_config(
+        page_title="VHI Data Analysis", 
+        page_icon=":chart_with_upwards_trend:", 
+        layout="wide"
+    )
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
+    os.makedirs(DATA_DIR, exist_ok=True)
 
 def main():
+    import streamlit as st
+    from vhi_cube import choose_level
+    from vhi_query import SEASONS, VhiQuery
+
+    setup_page()
     st.markdown('<h1 class="stTitle">🌍 Аналіз Вегетаційного Здоров\'я Регіонів</h1>', unsafe_allow_html=True)
     
-    df = read_data_to_dataframe(DATA_DIR)  
+    version = shared_data_version()
+    df = load_shared_data(version) if version else load_data(DATA_DIR)
 
     if df.empty:
         st.error("Дані відсутні. Будь ласка, перевірте:")
@@ -154,18 +272,21 @@ def main():
         )
     
         region_options = {k: v for k, v in allreg.items() if k in df['provinceid'].unique()}
-        selected_region = st.selectbox(
-            "Оберіть регіон",
+        selected_regions = st.multiselect(
+            "Оберіть регіони",
             options=list(region_options.keys()),
+            default=list(region_options.keys())[:1],
             format_func=lambda x: region_options[x],
-            help="Виберіть область України для деталізованого аналізу"
+            help="Виберіть одну або кілька областей України для аналізу"
         )
-        
+
+        season = st.selectbox("Сезон", list(SEASON_LABELS), format_func=SEASON_LABELS.get)
         min_week, max_week = st.slider(
             "Оберіть діапазон тижнів",
             min_value=int(df['week'].min()),
             max_value=int(df['week'].max()),
             value=(1, 52),
+            disabled=season is not None,
             help="Виберіть тижневий діапазон для аналізу"
         )
         
@@ -177,11 +298,14 @@ def main():
             help="Виберіть часовий діапазон для аналізу"
         )
 
-    filtered_df = df[
-        (df['provinceid'] == selected_region) & 
-        (df['week'] >= min_week) & (df['week'] <= max_week) & 
-        (df['year'] >= min_year) & (df['year'] <= max_year)
-    ].copy()
+    if not selected_regions:
+        st.warning("Оберіть хоча б один регіон")
+        return
+    service = get_query_service(DATA_DIR, version)
+    query_options = dict(regions=selected_regions, years=(min_year, max_year), season=season,
+                         weeks=None if season else (min_week, max_week), index=analysis_type)
+    if season:
+        min_week, max_week = SEASONS[season]
     
     with graf:
         tab1, tab2, tab3 = st.tabs(["📊 Таблиця даних", "📈 Часовий ряд", "🌐 Порівняння регіонів"])
@@ -189,28 +313,44 @@ def main():
         with tab1:
             st.subheader("Таблиця даних")
 
-            sort_column = st.selectbox("Сортувати за:", filtered_df.columns, index=0)
+            agg_col, by_col, size_col = st.columns(3)
+            with agg_col:
+                aggregate = st.selectbox("Агрегація значень", list(AGG_LABELS), format_func=AGG_LABELS.get)
+            with by_col:
+                by = st.selectbox("Групувати за", list(GROUP_LABELS), format_func=GROUP_LABELS.get,
+                                  disabled=aggregate is None)
+            with size_col:
+                page_size = st.selectbox("Рядків на сторінці", [25, 50, 100, 500], index=2)
+
+            columns = VhiQuery(**query_options, aggregate=aggregate, by=by).keys() + [analysis_type]
+            sort_column = st.selectbox("Сортувати за:", columns + (['weeks'] if aggregate else []), index=0)
             sort_order = st.radio("Порядок сортування:", ["Зростання", "Спадання"], horizontal=True)
-            filtered_df = filtered_df.sort_values(by=sort_column, ascending=(sort_order == "Зростання"))
-            st.dataframe(filtered_df, use_container_width=True)
+            query = VhiQuery(**query_options, aggregate=aggregate, by=by, sort=[sort_column],
+                             descending=sort_order == "Спадання")
+            with timer('streamlit.filter'):
+                total = service.run(query, 1, page_size).pages
+                page_number = st.number_input("Сторінка", min_value=1, max_value=total, value=1, step=1)
+                page = service.run(query, int(page_number), page_size)
+            st.dataframe(page.rows, use_container_width=True)
+            st.caption(f"Сторінка {page.number} з {page.pages}, рядків: {page.total}")
 
         
         with tab2:
-            if not filtered_df.empty:
-                st.subheader(f"{analysis_type.upper()} по роках ({region_options[selected_region]})")
-                
-                plot_df = filtered_df.copy()
-                plot_df['date'] = pd.to_datetime(plot_df['year'].astype(str) + '-W' + plot_df['week'].astype(str) + '-1', format='%Y-W%W-%w')
+            if service.run(VhiQuery(**query_options), 1, 1).total:
+                names = ', '.join(region_options[region] for region in selected_regions)
+                st.subheader(f"{analysis_type.upper()} по роках ({names})")
                 
-                plt.style.use('default') 
-                fig, ax = plt.subplots(figsize=(12, 6))
-                plt.plot(plot_df['date'], plot_df[analysis_type], label=analysis_type.upper(), color='#3498db', linewidth=2)
-                plt.title(f"{analysis_type.upper()} по роках", fontsize=15, fontweight='bold')
-                plt.xlabel("Дата", fontsize=12)
-                plt.ylabel(analysis_type.upper(), fontsize=12)
-                plt.grid(True, linestyle='--', alpha=0.7)
-                plt.legend()
-                st.pyplot(fig)
+                level_choice = st.selectbox("Агрегація", list(LEVEL_LABELS), format_func=LEVEL_LABELS.get)
+                level = choose_level(min_year, max_year) if level_choice == 'auto' else level_choice
+
+                series_df = get_cube(DATA_DIR, version).series(
+                    analysis_type, selected_regions,
+                    year_range=(min_year, max_year), week_range=(min_week, max_week), level=level
+                )
+                image = get_render_service().render(plot_time_series, series_df,
+                                                    analysis_type=analysis_type, level=level,
+                                                    names=region_options)
+                st.image(image, use_container_width=True)
             else:
                 st.warning("Немає даних для відображення графіку")
         
@@ -218,25 +358,21 @@ def main():
             st.subheader(f"{analysis_type.upper()} у різних регіонах")
             
             if 'province' in df.columns:
-                compare_stats = df.groupby(['provinceid', 'province'])[analysis_type].mean().reset_index()
-                
-                plt.style.use('default')  
-                fig, ax = plt.subplots(figsize=(12, 6))
-                bars = plt.bar(compare_stats['province'], compare_stats[analysis_type], color='#2ecc71')
-                plt.title(f"Середнє {analysis_type.upper()} по регіонах", fontsize=15, fontweight='bold')
-                plt.xlabel("Регіон", fontsize=12)
-                plt.ylabel(f"Середнє {analysis_type.upper()}", fontsize=12)
-                plt.xticks(rotation=90)
-                
-                for bar in bars:
-                    height = bar.get_height()
-                    plt.text(bar.get_x() + bar.get_width()/2., height,
-                             f'{height:.2f}', 
-                             ha='center', va='bottom', fontsize=9)
+                stat = st.selectbox("Статистика", list(STAT_LABELS), format_func=STAT_LABELS.get)
+                compare_stats = get_aggregates(DATA_DIR, version).summary(
+                    analysis_type, year_range=(min_year, max_year), week_range=(min_week, max_week)
+                )
+                compare_stats['province'] = compare_stats['provinceid'].map(allreg)
+                compare_stats = compare_stats.dropna(subset=['province', stat])
                 
-                st.pyplot(fig)
+                image = get_render_service().render(plot_region_comparison, compare_stats,
+                                                    analysis_type=analysis_type, stat=stat)
+                st.image(image, use_container_width=True)
             else:
                 st.warning("Відсутні дані про регіони для порівняння")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    setup_from_env('lab3AD')
+    count('streamlit.reruns')
+    with timer('streamlit.rerun'):
+        main()
\ No newline at end of file
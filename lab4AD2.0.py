@@ -1,108 +1,160 @@
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import pearsonr, spearmanr
-from sklearn.preprocessing import OneHotEncoder
+import argparse
+import os
+
+# numpy, pandas, matplotlib, seaborn і модулі mpg_* імпортуються у функціях,
+# що їх використовують: імпорт скрипта (зокрема у воркерах RenderService)
+# не тягне за собою всього стеку візуалізації.
 
 file_path = r'D:\AD\lab4\auto-mpg.data'
 column_names = ['mpg', 'cylinders', 'displacement', 'horsepower', 'weight',
                 'acceleration', 'model_year', 'origin', 'car_name']
-df = pd.read_csv(file_path, header=None, names=column_names,
-                 sep=r'\s+', na_values='?')
-
-df['horsepower'] = pd.to_numeric(df['horsepower'], errors='coerce')
-df['horsepower_median'] = df['horsepower'].fillna(df['horsepower'].median())
-df['horsepower_interp'] = df['horsepower'].interpolate()
-df['horsepower'] = df['horsepower_interp']
-df.drop(['horsepower_median', 'horsepower_interp'], axis=1, inplace=True)
-
-def normalize_df(df, columns):
-    return df[columns].apply(lambda x: (x - x.min()) / (x.max() - x.min()))
-
-def standardize_df(df, columns):
-    return df[columns].apply(lambda x: (x - x.mean()) / x.std())
 
-normalized_data = normalize_df(df, ['mpg', 'cylinders', 'displacement'])
-standardized_data = standardize_df(df, ['mpg', 'cylinders', 'displacement'])
+def load_data(file_path):
+    import pandas as pd
 
-plt.figure(figsize=(8, 5))
-sns.histplot(df['mpg'], bins=10, kde=True)
-plt.title('Histogram of MPG')
-plt.xlabel('MPG')
-plt.ylabel('Frequency')
-plt.show()
+    df = pd.read_csv(file_path, header=None, names=column_names,
+                     sep=r'\s+', na_values='?')
+    df['horsepower'] = pd.to_numeric(df['horsepower'], errors='coerce').interpolate()
+    return df
 
-plt.figure(figsize=(8, 5))
-sns.lineplot(x=df.index, y=df['mpg'])
-plt.title('Line Plot of MPG over Index')
-plt.xlabel('Index')
-plt.ylabel('MPG')
-plt.show()
+def plot_mpg_histogram(df):
+    import matplotlib.pyplot as plt
+    import mpg_plots
 
-pearson_corr, _ = pearsonr(df['horsepower'], df['mpg'])
-spearman_corr, _ = spearmanr(df['horsepower'], df['mpg'])
+    fig, ax = plt.subplots(figsize=(8, 5))
+    mpg_plots.histplot(ax, df['mpg'], bins=10, kde=True)
+    ax.set_title('Histogram of MPG')
+    ax.set_xlabel('MPG')
+    ax.set_ylabel('Frequency')
+    return fig
 
-print("-" * 70)
-print(f"Pearson correlation (horsepower vs mpg): {pearson_corr:.4f}")
-print(f"Spearman correlation (horsepower vs mpg): {spearman_corr:.4f}")
-print("-" * 70)
+def plot_mpg_line(df):
+    import matplotlib.pyplot as plt
+    import mpg_plots
 
-encoder = OneHotEncoder(sparse_output=False)
-origin_encoded = encoder.fit_transform(df[['origin']])
-origin_df = pd.DataFrame(origin_encoded, columns=encoder.get_feature_names_out(['origin']))
-
-
-df_encoded = pd.concat([df.drop('origin', axis=1), origin_df], axis=1)
-print(df_encoded.head())
+    fig, ax = plt.subplots(figsize=(8, 5))
+    mpg_plots.lineplot(ax, df.index, df['mpg'])
+    ax.set_title('Line Plot of MPG over Index')
+    ax.set_xlabel('Index')
+    ax.set_ylabel('MPG')
+    return fig
 
 # 1
-df_numeric = df.select_dtypes(include='number')
-
-df_numeric.hist(
-    bins=15, 
-    color='steelblue', 
-    edgecolor='black', 
-    linewidth=1.0,
-    xlabelsize=8, 
-    ylabelsize=8, 
-    grid=False
-)
-
-plt.tight_layout(rect=(0, 0, 1.2, 1.2))
-plt.suptitle('Гістограми числових ознак автомобілів', fontsize=14, y=1.02)
-plt.show()
+def plot_numeric_histograms(df_numeric):
+    import numpy as np
+
+    axes = df_numeric.hist(
+        bins=15, 
+        color='steelblue', 
+        edgecolor='black', 
+        linewidth=1.0,
+        xlabelsize=8, 
+        ylabelsize=8, 
+        grid=False
+    )
+    fig = np.ravel(axes)[0].figure
+    fig.tight_layout(rect=(0, 0, 1.2, 1.2))
+    fig.suptitle('Гістограми числових ознак автомобілів', fontsize=14, y=1.02)
+    return fig
 
 # 2
-plt.figure(figsize=(10, 6))
-corr = df_numeric.corr(numeric_only=True)
-
-sns.heatmap(
-    round(corr, 2),
-    annot=True,
-    cmap="coolwarm",
-    fmt='.2f',
-    linewidths=0.5
-)
-
-plt.title('Теплова карта кореляцій між характеристиками авто', fontsize=14)
-plt.tight_layout()
-plt.show()
+def plot_corr_heatmap(corr):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.heatmap(
+        round(corr, 2),
+        annot=True,
+        cmap="coolwarm",
+        fmt='.2f',
+        linewidths=0.5,
+        ax=ax
+    )
+    ax.set_title('Теплова карта кореляцій між характеристиками авто', fontsize=14)
+    fig.tight_layout()
+    return fig
 
 # 3
-selected_cols = ['mpg', 'horsepower', 'weight', 'acceleration', 'model_year']
-df_pairplot = df[selected_cols].copy()
-
-df_pairplot['year_group'] = pd.cut(df['model_year'], bins=3, labels=["старі", "середні", "нові"])
-
-pp = sns.pairplot(
-    df_pairplot,
-    hue='year_group',
-    palette={'старі': '#FF9999', 'середні': '#FFE888', 'нові': '#88FFAA'},
-    plot_kws=dict(edgecolor="black", linewidth=0.5),
-    diag_kind='kde'
-)
-
-pp.fig.subplots_adjust(top=0.92)
-pp.fig.suptitle('Парні графіки: MPG, потужність, вага, прискорення', fontsize=14)
-plt.show()
+def plot_pairs(df_pairplot):
+    import mpg_plots
+
+    selected_cols = [col for col in df_pairplot.columns if col != 'year_group']
+    pp_fig = mpg_plots.pairplot(
+        df_pairplot,
+        selected_cols,
+        hue='year_group',
+        palette={'старі': '#FF9999', 'середні': '#FFE888', 'нові': '#88FFAA'},
+        overlay_sample=5000,
+        plot_kws=dict(edgecolor="black", linewidth=0.5),
+        diag_kind='kde'
+    )
+    pp_fig.subplots_adjust(top=0.92)
+    pp_fig.suptitle('Парні графіки: MPG, потужність, вага, прискорення', fontsize=14)
+    return pp_fig
+
+def main():
+    parser = argparse.ArgumentParser(description="Аналіз auto-mpg")
+    parser.add_argument('--data', default=file_path)
+    parser.add_argument('--report', metavar='DIR', help="зберегти графіки у DIR без відображення")
+    parser.add_argument('--format', default='png', choices=['png', 'svg'])
+    args = parser.parse_args()
+
+    import pandas as pd
+    from mpg_pipeline import FeaturePipeline
+    from mpg_corr import CorrelationEngine
+
+    df = load_data(args.data)
+
+    pipeline = FeaturePipeline(['mpg', 'cylinders', 'displacement'], categorical_columns=['origin']).fit(df)
+    normalized_data = pipeline.transform(df, scaling='minmax')
+    standardized_data = pipeline.transform(df, scaling='standard')
+
+    df_numeric = df.select_dtypes(include='number')
+    corr_engine = CorrelationEngine(df_numeric)
+
+    pearson_corr = corr_engine.pair('horsepower', 'mpg', method='pearson')
+    spearman_corr = corr_engine.pair('horsepower', 'mpg', method='spearman')
+    pearson_low, pearson_high = corr_engine.pair_confidence_interval('horsepower', 'mpg', method='pearson', seed=42)
+    spearman_low, spearman_high = corr_engine.pair_confidence_interval('horsepower', 'mpg', method='spearman', seed=42)
+
+    print("-" * 70)
+    print(f"Pearson correlation (horsepower vs mpg): {pearson_corr:.4f}  95% CI [{pearson_low:.4f}, {pearson_high:.4f}]")
+    print(f"Spearman correlation (horsepower vs mpg): {spearman_corr:.4f}  95% CI [{spearman_low:.4f}, {spearman_high:.4f}]")
+    print("-" * 70)
+
+    df_encoded = pipeline.encode(df)
+    print(df_encoded.head())
+
+    selected_cols = ['mpg', 'horsepower', 'weight', 'acceleration', 'model_year']
+    df_pairplot = df[selected_cols].copy()
+    df_pairplot['year_group'] = pd.cut(df['model_year'], bins=3, labels=["старі", "середні", "нові"])
+
+    figures = [
+        ('mpg_histogram', plot_mpg_histogram, df[['mpg']]),
+        ('mpg_line', plot_mpg_line, df[['mpg']]),
+        ('numeric_histograms', plot_numeric_histograms, df_numeric),
+        ('corr_heatmap', plot_corr_heatmap, corr_engine.frame('pearson')),
+        ('pairplot', plot_pairs, df_pairplot),
+    ]
+
+    if args.report:
+        from render_cache import RenderService
+
+        service = RenderService(cache_dir=os.path.join(args.report, '.cache'))
+        images = service.render_many([(func, data, {}) for _, func, data in figures], fmt=args.format)
+        service.shutdown()
+        for (name, _, _), image in zip(figures, images):
+            with open(os.path.join(args.report, f"{name}.{args.format}"), 'wb') as f:
+                f.write(image)
+        print(f"Збережено {len(images)} графіків у {args.report} (з кешу: {service.hits})")
+        return
+
+    import matplotlib.pyplot as plt
+
+    for _, func, data in figures:
+        func(data)
+    plt.show()
+
+if __name__ == "__main__":
+    main()
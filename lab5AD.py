@@ -7,9 +7,6 @@
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.widgets import Slider, Button, CheckButtons
-from scipy.signal import butter, filtfilt
 
 start_params = {
     "amplitude": 1.0,
@@ -21,100 +18,126 @@ start_params = {
     "show_noise": True
 }
 
+# Звичайний формат замість mathtext: текст значення перемальовується на кожному
+# кадрі перетягування, а розбір mathtext для нового числа коштує ~10 мс.
+VALFMT = "%1.2f"
+
 t = np.linspace(0, 10, 1000)
 stored_noise = None 
 
+def harmonic(t, amplitude, frequency, phase):
+    return amplitude * np.sin(2 * np.pi * frequency * t + phase)
+
+def generate_noise(t, noise_mean, noise_covariance):
+    return np.random.normal(noise_mean, np.sqrt(noise_covariance), size=t.shape)
+
 def harmonic_with_noise(t, amplitude, frequency, phase, noise_mean, noise_covariance, regenerate_noise=False):
     global stored_noise
-    clean_signal = amplitude * np.sin(2 * np.pi * frequency * t + phase)
+    clean_signal = harmonic(t, amplitude, frequency, phase)
     if regenerate_noise or stored_noise is None:
-        noise = np.random.normal(noise_mean, np.sqrt(noise_covariance), size=t.shape)
+        noise = generate_noise(t, noise_mean, noise_covariance)
         stored_noise = noise
     else:
         noise = stored_noise
     return clean_signal + noise, clean_signal
 
 def lowpass_filter(signal, cutoff, fs=100, order=5):
+    from scipy.signal import butter, filtfilt
+
     nyq = 0.5 * fs
     normal_cutoff = cutoff / nyq
     b, a = butter(order, normal_cutoff, btype='low', analog=False)
     return filtfilt(b, a, signal)
 
-fig, ax = plt.subplots()
-plt.subplots_adjust(left=0.25, bottom=0.45)
-noisy_signal, clean_signal = harmonic_with_noise(t, **{k: start_params[k] for k in [
-    "amplitude", "frequency", "phase", "noise_mean", "noise_covariance"]}, regenerate_noise=True)
-filtered_signal = lowpass_filter(noisy_signal, start_params["cutoff"])
-
-noisy_line, = ax.plot(t, noisy_signal, color='orange', label="Noisy Signal")
-clean_line, = ax.plot(t, clean_signal, color='blue', linestyle='--', label="Clean Signal")
-filtered_line, = ax.plot(t, filtered_signal, color='purple', linewidth=2, label="Filtered Signal")
-ax.set_ylim(-2, 2)
-ax.legend()
-
-axamp = plt.axes([0.25, 0.37, 0.65, 0.03])
-axfreq = plt.axes([0.25, 0.33, 0.65, 0.03])
-axphase = plt.axes([0.25, 0.29, 0.65, 0.03])
-axnmean = plt.axes([0.25, 0.25, 0.65, 0.03])
-axncov = plt.axes([0.25, 0.21, 0.65, 0.03])
-axcutoff = plt.axes([0.25, 0.17, 0.65, 0.03])
-
-samp = Slider(axamp, 'Amplitude', 0.1, 2.0, valinit=start_params["amplitude"])
-sfreq = Slider(axfreq, 'Frequency', 0.01, 2.0, valinit=start_params["frequency"])
-sphase = Slider(axphase, 'Phase', 0.0, 2 * np.pi, valinit=start_params["phase"])
-snmean = Slider(axnmean, 'Noise Mean', -1.0, 1.0, valinit=start_params["noise_mean"])
-sncov = Slider(axncov, 'Noise Covariance', 0.0, 1.0, valinit=start_params["noise_covariance"])
-scutoff = Slider(axcutoff, 'Cutoff Frequency', 0.1, 10.0, valinit=start_params["cutoff"])
-
-resetax = plt.axes([0.25, 0.05, 0.1, 0.04])
-button = Button(resetax, 'Reset')
-
-checkax = plt.axes([0.75, 0.05, 0.15, 0.1])
-check = CheckButtons(checkax, ['Show Noise'], [start_params["show_noise"]])
-
-def update(val):
-    global stored_noise
-    params = {
-        "amplitude": samp.val,
-        "frequency": sfreq.val,
-        "phase": sphase.val,
-        "noise_mean": snmean.val,
-        "noise_covariance": sncov.val,
-    }
-    cutoff = scutoff.val
-    show_noise = check.get_status()[0]
-
-    regenerate_noise = update.prev_noise_mean != params["noise_mean"] or \
-                       update.prev_noise_covariance != params["noise_covariance"]
-
-    noisy_signal, clean_signal = harmonic_with_noise(t, **params, regenerate_noise=regenerate_noise)
-    filtered_signal = lowpass_filter(noisy_signal, cutoff)
-
-    noisy_line.set_ydata(noisy_signal if show_noise else np.full_like(t, np.nan))
-    clean_line.set_ydata(clean_signal)
-    filtered_line.set_ydata(filtered_signal)
-
-    update.prev_noise_mean = params["noise_mean"]
-    update.prev_noise_covariance = params["noise_covariance"]
-    fig.canvas.draw_idle()
-
-update.prev_noise_mean = start_params["noise_mean"]
-update.prev_noise_covariance = start_params["noise_covariance"]
-
-for slider in [samp, sfreq, sphase, snmean, sncov, scutoff]:
-    slider.on_changed(update)
-check.on_clicked(update)
-
-def reset(event):
-    global stored_noise
-    stored_noise = None
-    samp.reset()
-    sfreq.reset()
-    sphase.reset()
-    snmean.reset()
-    sncov.reset()
-    scutoff.reset()
-    check.set_active(0)  
-button.on_clicked(reset)
-
-plt.show()
+def main():
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import Slider, Button, CheckButtons
+    from slider_events import DebouncedUpdater
+
+    fig, ax = plt.subplots()
+    plt.subplots_adjust(left=0.25, bottom=0.45)
+    clean_signal = harmonic(t, start_params["amplitude"], start_params["frequency"], start_params["phase"])
+    noise = generate_noise(t, start_params["noise_mean"], start_params["noise_covariance"])
+    noisy_signal = clean_signal + noise
+    filtered_signal = lowpass_filter(noisy_signal, start_params["cutoff"])
+
+    noisy_line, = ax.plot(t, noisy_signal, color='orange', label="Noisy Signal")
+    clean_line, = ax.plot(t, clean_signal, color='blue', linestyle='--', label="Clean Signal")
+    filtered_line, = ax.plot(t, filtered_signal, color='purple', linewidth=2, label="Filtered Signal")
+    ax.set_ylim(-2, 2)
+    ax.legend()
+
+    axamp = plt.axes([0.25, 0.37, 0.65, 0.03])
+    axfreq = plt.axes([0.25, 0.33, 0.65, 0.03])
+    axphase = plt.axes([0.25, 0.29, 0.65, 0.03])
+    axnmean = plt.axes([0.25, 0.25, 0.65, 0.03])
+    axncov = plt.axes([0.25, 0.21, 0.65, 0.03])
+    axcutoff = plt.axes([0.25, 0.17, 0.65, 0.03])
+
+    samp = Slider(axamp, 'Amplitude', 0.1, 2.0, valinit=start_params["amplitude"], valfmt=VALFMT)
+    sfreq = Slider(axfreq, 'Frequency', 0.01, 2.0, valinit=start_params["frequency"], valfmt=VALFMT)
+    sphase = Slider(axphase, 'Phase', 0.0, 2 * np.pi, valinit=start_params["phase"], valfmt=VALFMT)
+    snmean = Slider(axnmean, 'Noise Mean', -1.0, 1.0, valinit=start_params["noise_mean"], valfmt=VALFMT)
+    sncov = Slider(axncov, 'Noise Covariance', 0.0, 1.0, valinit=start_params["noise_covariance"], valfmt=VALFMT)
+    scutoff = Slider(axcutoff, 'Cutoff Frequency', 0.1, 10.0, valinit=start_params["cutoff"], valfmt=VALFMT)
+
+    resetax = plt.axes([0.25, 0.05, 0.1, 0.04])
+    button = Button(resetax, 'Reset')
+
+    checkax = plt.axes([0.75, 0.05, 0.15, 0.1])
+    check = CheckButtons(checkax, ['Show Noise'], [start_params["show_noise"]])
+    sliders = [samp, sfreq, sphase, snmean, sncov, scutoff]
+    # Reset лише збільшує лічильник у GUI-потоці; шум живе у воркері (compute).
+    resets = [0]
+
+    def read_params():
+        return {
+            "amplitude": samp.val,
+            "frequency": sfreq.val,
+            "phase": sphase.val,
+            "noise_mean": snmean.val,
+            "noise_covariance": sncov.val,
+            "cutoff": scutoff.val,
+            "show_noise": check.get_status()[0],
+            "reset": resets[0],
+        }
+
+    noise_state = {"key": (start_params["noise_mean"], start_params["noise_covariance"], 0), "noise": noise}
+
+    def compute(params):
+        # Виконується лише у воркері, тож стан шуму не ділиться з GUI-потоком.
+        key = (params["noise_mean"], params["noise_covariance"], params["reset"])
+        if key != noise_state["key"]:
+            noise_state["key"] = key
+            noise_state["noise"] = generate_noise(t, params["noise_mean"], params["noise_covariance"])
+        clean_signal = harmonic(t, params["amplitude"], params["frequency"], params["phase"])
+        noisy_signal = clean_signal + noise_state["noise"]
+        filtered_signal = lowpass_filter(noisy_signal, params["cutoff"])
+        return (noisy_signal if params["show_noise"] else np.full_like(t, np.nan)), clean_signal, filtered_signal
+
+    def apply(result):
+        noisy_signal, clean_signal, filtered_signal = result
+        noisy_line.set_ydata(noisy_signal)
+        clean_line.set_ydata(clean_signal)
+        filtered_line.set_ydata(filtered_signal)
+
+    update = DebouncedUpdater(fig, read_params, compute, apply,
+                              [noisy_line, clean_line, filtered_line], widgets=sliders)
+
+    for slider in sliders:
+        slider.on_changed(update)
+    check.on_clicked(update)
+
+    def reset(event):
+        resets[0] += 1
+        for slider in sliders:
+            slider.reset()
+        check.set_active(0)
+        update()
+    button.on_clicked(reset)
+
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Препроцесинг ознак для auto-mpg та подібних автомобільних каталогів.
+
+Статистики (кількість, середнє, M2, мін, макс) рахуються один раз і можуть
+накопичуватися по частинах через partial_fit (злиття за Чаном), тож великі
+каталоги можна читати чанками. Масштабування виконується одним NumPy
+broadcast над усіма числовими стовпцями, one-hot кодування — порівнянням
+кодів категорій без sklearn і pd.concat.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class FeaturePipeline:
+    def __init__(self, numeric_columns, categorical_columns=(), scaling='standard', dtype=np.float64):
+        if scaling not in ('standard', 'minmax'):
+            raise ValueError(f"Невідомий тип масштабування: {scaling}")
+        self.numeric_columns = list(numeric_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.scaling = scaling
+        self.dtype = np.dtype(dtype)
+        self.reset()
+
+    def reset(self):
+        k = len(self.numeric_columns)
+        self.n_ = np.zeros(k)
+        self.mean_ = np.zeros(k)
+        self.m2_ = np.zeros(k)
+        self.min_ = np.full(k, np.inf)
+        self.max_ = np.full(k, -np.inf)
+        self.categories_ = {col: None for col in self.categorical_columns}
+        return self
+
+    def fit(self, df):
+        return self.reset().partial_fit(df)
+
+    def partial_fit(self, df):
+        if self.numeric_columns:
+            x = df[self.numeric_columns].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(x)
+            n_b = valid.sum(axis=0).astype(np.float64)
+            seen = n_b > 0
+            safe_n = np.where(seen, n_b, 1.0)
+            mean_b = np.where(valid, x, 0.0).sum(axis=0) / safe_n
+            m2_b = np.where(valid, (x - mean_b) ** 2, 0.0).sum(axis=0)
+
+            n = self.n_ + n_b
+            safe_total = np.where(n > 0, n, 1.0)
+            delta = mean_b - self.mean_
+            self.mean_ = np.where(seen, self.mean_ + delta * n_b / safe_total, self.mean_)
+            self.m2_ = np.where(seen, self.m2_ + m2_b + delta ** 2 * self.n_ * n_b / safe_total, self.m2_)
+            self.n_ = n
+            self.min_ = np.fmin(self.min_, np.where(valid, x, np.inf).min(axis=0, initial=np.inf))
+            self.max_ = np.fmax(self.max_, np.where(valid, x, -np.inf).max(axis=0, initial=-np.inf))
+
+        for col in self.categorical_columns:
+            values = np.unique(df[col].dropna().to_numpy())
+            known = self.categories_[col]
+            self.categories_[col] = values if known is None else np.union1d(known, values)
+        return self
+
+    @property
+    def std_(self):
+        # ddof=1, як у pandas Series.std()
+        return np.sqrt(self.m2_ / np.maximum(self.n_ - 1, 1))
+
+    def _center_scale(self, scaling):
+        if scaling == 'minmax':
+            center, scale = self.min_, self.max_ - self.min_
+        else:
+            center, scale = self.mean_, self.std_
+        scale = np.where(scale > 0, scale, 1.0)
+        return center.astype(self.dtype), scale.astype(self.dtype)
+
+    def transform_array(self, df, scaling=None):
+        scaling = scaling or self.scaling
+        x = df[self.numeric_columns].to_numpy(dtype=self.dtype)
+        center, scale = self._center_scale(scaling)
+        return (x - center) / scale
+
+    def transform(self, df, scaling=None):
+        return pd.DataFrame(self.transform_array(df, scaling),
+                            columns=self.numeric_columns, index=df.index)
+
+    def fit_transform(self, df, scaling=None):
+        return self.fit(df).transform(df, scaling)
+
+    def feature_names(self):
+        names = []
+        for col in self.categorical_columns:
+            names.extend(f"{col}_{category:g}" if isinstance(category, (int, float, np.number))
+                         else f"{col}_{category}" for category in self.categories_[col])
+        return names
+
+    def one_hot_array(self, df):
+        blocks = []
+        for col in self.categorical_columns:
+            categories = self.categories_[col]
+            codes = pd.Categorical(df[col], categories=categories).codes
+            blocks.append(codes[:, None] == np.arange(len(categories)))
+        if not blocks:
+            return np.empty((len(df), 0), dtype=self.dtype)
+        return np.hstack(blocks).astype(self.dtype)
+
+    def encode(self, df):
+        # Вихідний фрейм без категоріальних стовпців + one-hot ознаки, зібраний за один виклик.
+        one_hot = self.one_hot_array(df)
+        columns = {col: df[col] for col in df.columns if col not in self.categorical_columns}
+        columns.update(zip(self.feature_names(), one_hot.T))
+        return pd.DataFrame(columns, index=df.index)
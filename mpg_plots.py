@@ -0,0 +1,161 @@
+"""
+Графіки EDA для великих таблиць.
+
+Для невеликих вибірок використовується звичайний seaborn. Коли рядків більше
+за LARGE_DATA_THRESHOLD, функції автоматично переходять у режим агрегатів:
+гістограми будуються з наперед порахованих np.histogram, KDE — згорткою
+бінованих даних з гаусовим ядром через FFT, лінійний графік — смугою
+min/mean/max по бінах, а парні панелі — 2-D гістограмами (pcolormesh).
+Дані для панелей рахуються паралельно в пулі потоків (NumPy відпускає GIL),
+малювання лишається в головному потоці. Для накладання точок є
+стратифікована вибірка.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+LARGE_DATA_THRESHOLD = 200_000
+
+
+def is_large(data, large=None):
+    return len(data) > LARGE_DATA_THRESHOLD if large is None else large
+
+
+def fft_kde(values, grid_size=512, bw_method='scott', limits=None):
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    n = values.size
+    if n < 2:
+        return np.array([]), np.array([])
+    std = values.std(ddof=1)
+    if bw_method == 'scott':
+        bandwidth = std * n ** (-1 / 5)
+    elif bw_method == 'silverman':
+        bandwidth = std * (n * 3 / 4) ** (-1 / 5)
+    else:
+        bandwidth = float(bw_method) * std
+    if bandwidth <= 0:
+        bandwidth = 1e-3
+    low, high = limits if limits is not None else (values.min(), values.max())
+    low, high = low - 3 * bandwidth, high + 3 * bandwidth
+    counts, edges = np.histogram(values, bins=grid_size, range=(low, high))
+    grid = (edges[:-1] + edges[1:]) / 2
+    dx = edges[1] - edges[0]
+    half = min(grid_size, int(np.ceil(4 * bandwidth / dx)))
+    offsets = np.arange(-half, half + 1) * dx
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    kernel /= kernel.sum()
+    from scipy.signal import fftconvolve
+    density = fftconvolve(counts, kernel, mode='same') / (n * dx)
+    return grid, np.clip(density, 0, None)
+
+
+def stratified_sample(df, by, n, seed=42):
+    if len(df) <= n:
+        return df
+    frac = n / len(df)
+    return (df.groupby(by, observed=True, group_keys=False)
+              .sample(frac=frac, random_state=seed))
+
+
+def histplot(ax, values, bins=10, kde=True, large=None, color='steelblue'):
+    values = pd.Series(values).dropna()
+    if not is_large(values, large):
+        import seaborn as sns
+        sns.histplot(values, bins=bins, kde=kde, ax=ax, color=color)
+        return ax
+    counts, edges = np.histogram(values.to_numpy(), bins=bins)
+    ax.stairs(counts, edges, fill=True, color=color, alpha=0.6)
+    if kde:
+        grid, density = fft_kde(values.to_numpy())
+        ax.plot(grid, density * len(values) * (edges[1] - edges[0]), color=color)
+    return ax
+
+
+def lineplot(ax, x, y, large=None, n_bins=2000, color='steelblue'):
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    if not is_large(y, large) or y.size <= n_bins:
+        import seaborn as sns
+        sns.lineplot(x=x, y=y, ax=ax, color=color)
+        return ax
+    # y впорядковано за x: кожен бін — суцільний відрізок, агрегуємо через reduceat
+    starts = np.linspace(0, y.size, n_bins, endpoint=False).astype(np.intp)
+    centers = x[starts + np.diff(np.append(starts, y.size)) // 2]
+    filled = np.where(np.isnan(y), 0.0, y)
+    counts = np.add.reduceat(~np.isnan(y), starts)
+    means = np.add.reduceat(filled, starts) / np.where(counts > 0, counts, np.nan)
+    lows = np.fmin.reduceat(y, starts)
+    highs = np.fmax.reduceat(y, starts)
+    ax.fill_between(centers, lows, highs, color=color, alpha=0.3, linewidth=0)
+    ax.plot(centers, means, color=color)
+    return ax
+
+
+def _panel_data(data, hue_codes, n_hue, x_col, y_col, limits, gridsize):
+    if x_col == y_col:
+        curves = []
+        for code in range(n_hue):
+            values = data[x_col][hue_codes == code]
+            curves.append(fft_kde(values, limits=limits[x_col]))
+        return curves
+    x, y = data[x_col], data[y_col]
+    valid = ~(np.isnan(x) | np.isnan(y))
+    counts, xedges, yedges = np.histogram2d(
+        x[valid], y[valid], bins=gridsize, range=[limits[x_col], limits[y_col]])
+    return counts, xedges, yedges
+
+
+def pairplot(df, columns, hue=None, palette=None, large=None, gridsize=60,
+             overlay_sample=None, workers=None, seed=42, **seaborn_kws):
+    if not is_large(df, large):
+        import seaborn as sns
+        return sns.pairplot(df, vars=columns, hue=hue, palette=palette, **seaborn_kws).fig
+
+    data = {col: df[col].to_numpy(dtype=np.float64) for col in columns}
+    limits = {col: (np.nanmin(values), np.nanmax(values)) for col, values in data.items()}
+    if hue is not None:
+        hue_values = pd.Categorical(df[hue])
+        levels = list(hue_values.categories)
+        hue_codes = hue_values.codes
+    else:
+        levels = [None]
+        hue_codes = np.zeros(len(df), dtype=np.int8)
+    colors = [palette[level] if palette and level is not None else f"C{i}"
+              for i, level in enumerate(levels)]
+
+    cells = [(x_col, y_col) for y_col in columns for x_col in columns]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        panels = list(pool.map(
+            lambda cell: _panel_data(data, hue_codes, len(levels), *cell, limits, gridsize), cells))
+
+    p = len(columns)
+    import matplotlib.pyplot as plt
+    fig, axes = plt.subplots(p, p, figsize=(2.5 * p, 2.5 * p), squeeze=False)
+    overlay = None
+    if overlay_sample:
+        overlay = stratified_sample(df, hue, overlay_sample, seed) if hue else df.sample(
+            n=min(overlay_sample, len(df)), random_state=seed)
+    for (x_col, y_col), panel in zip(cells, panels):
+        ax = axes[columns.index(y_col)][columns.index(x_col)]
+        if x_col == y_col:
+            for (grid, density), color, level in zip(panel, colors, levels):
+                if grid.size:
+                    ax.plot(grid, density, color=color, label=level)
+        else:
+            counts, xedges, yedges = panel
+            ax.pcolormesh(xedges, yedges, np.ma.masked_equal(counts.T, 0), cmap='viridis')
+            if overlay is not None:
+                ax.scatter(overlay[x_col], overlay[y_col], s=2, alpha=0.5,
+                           c=[colors[c] for c in pd.Categorical(overlay[hue], categories=levels).codes]
+                           if hue else colors[0])
+        if y_col == columns[-1]:
+            ax.set_xlabel(x_col)
+        if x_col == columns[0]:
+            ax.set_ylabel(y_col)
+    if hue is not None:
+        handles, labels = axes[0][0].get_legend_handles_labels()
+        fig.legend(handles, labels, title=hue, loc='center right')
+    return fig
@@ -0,0 +1,130 @@
+"""
+Локальна заглушка ендпоінту NOAA get_TS_admin.php з інжекцією збоїв.
+
+Віддає синтетичний CSV у форматі NOAA (synthetic_data.vhi_csv) для будь-якої
+області та діапазону років, а з заданими ймовірностями — помилки 500/503,
+429 з Retry-After, повільні відповіді (для перевірки таймаутів) і обірване
+тіло (Content-Length більший за фактичні дані). fail_first змушує перші N
+запитів кожної області завершуватись помилкою — зручно для детермінованої
+перевірки повторів.
+
+Приклад:
+    python noaa_stub.py --port 8765 --error-rate 0.2 --throttle-rate 0.1
+    python vhi_ingest.py --base-url http://127.0.0.1:8765/get_TS_admin.php
+"""
+
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from synthetic_data import vhi_csv
+
+
+class FaultConfig:
+    def __init__(self, error_rate=0.0, throttle_rate=0.0, slow_rate=0.0, truncate_rate=0.0,
+                 delay=5.0, retry_after=1, fail_first=0, seed=0):
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.slow_rate = slow_rate
+        self.truncate_rate = truncate_rate
+        self.delay = delay
+        self.retry_after = retry_after
+        self.fail_first = fail_first
+        self.rng = random.Random(seed)
+        self.seen = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def choose(self, key):
+        with self.lock:
+            self.requests += 1
+            self.seen[key] = self.seen.get(key, 0) + 1
+            if self.seen[key] <= self.fail_first:
+                return 'error'
+            roll = self.rng.random()
+        for fault, rate in (('error', self.error_rate), ('throttle', self.throttle_rate),
+                            ('slow', self.slow_rate), ('truncate', self.truncate_rate)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+
+def make_handler(faults):
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            try:
+                province_id = int(query['provinceID'][0])
+                start_year = int(query.get('year1', ['1981'])[0])
+                end_year = int(query.get('year2', ['2024'])[0])
+            except (KeyError, ValueError):
+                self.send_error(400)
+                return
+            key = (query.get('country', [''])[0], province_id, query.get('type', ['Mean'])[0])
+            fault = faults.choose(key)
+            if fault == 'error':
+                self.send_error(faults.rng.choice([500, 503]))
+                return
+            if fault == 'throttle':
+                self.send_response(429)
+                self.send_header('Retry-After', str(faults.retry_after))
+                self.end_headers()
+                return
+            if fault == 'slow':
+                time.sleep(faults.delay)
+
+            body = vhi_csv(province_id, start_year, end_year)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if fault == 'truncate':
+                self.wfile.write(body[:len(body) // 2])
+                self.close_connection = True
+                return
+            self.wfile.write(body)
+
+    return StubHandler
+
+
+def start_stub(port=0, **fault_options):
+    """Запускає заглушку у фоновому потоці; повертає (сервер, base_url, faults)."""
+    faults = FaultConfig(**fault_options)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(faults))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/get_TS_admin.php", faults
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заглушка NOAA з інжекцією збоїв")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--truncate-rate', type=float, default=0.0)
+    parser.add_argument('--delay', type=float, default=5.0, help="затримка повільної відповіді, с")
+    parser.add_argument('--fail-first', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server, base_url, _ = start_stub(args.port, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                                     slow_rate=args.slow_rate, truncate_rate=args.truncate_rate,
+                                     delay=args.delay, fail_first=args.fail_first, seed=args.seed)
+    print(f"Заглушка NOAA: {base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Офскрін-рендеринг фігур matplotlib з кешуванням байтів зображень.
+
+Функція побудови має вигляд plot_func(data, **params) -> Figure. Ключ кешу —
+sha256 від імені функції, її байткоду з константами, хешу даних
+(hash_pandas_object / байти масиву) та параметрів, тому повторний виклик з
+тими самими вхідними даними повертає готові PNG/SVG байти без рендерингу, а
+змінений код функції не віддає старих картинок з дискового кешу. Рендеринг іде на бекенді Agg (дисплей не
+потрібен) — у пулі процесів, або в поточному процесі при workers=0, що
+потрібно для Streamlit, де функції зі скрипта не серіалізуються.
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from digests import data_digest
+
+
+def _use_agg():
+    # Ініціалізатор робочих процесів: жодних GUI-бекендів у воркерах.
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+
+def code_digest(code, hasher):
+    # repr вкладених code-об'єктів (лямбди, внутрішні функції) містить адресу,
+    # тож вони хешуються рекурсивно, щоб ключ був однаковим між процесами.
+    hasher.update(code.co_code)
+    hasher.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            code_digest(const, hasher)
+        else:
+            hasher.update(repr(const).encode())
+    return hasher
+
+
+def cache_key(plot_func, data, fmt, dpi, params):
+    hasher = hashlib.sha256()
+    hasher.update(f"{plot_func.__module__}.{plot_func.__qualname__}|{fmt}|{dpi}".encode())
+    code = getattr(plot_func, '__code__', None)
+    if code is not None:
+        code_digest(code, hasher)
+    hasher.update(repr(sorted(params.items())).encode())
+    data_digest(data, hasher)
+    return hasher.hexdigest()
+
+
+def render_figure(plot_func, data, fmt='png', dpi=100, params=None):
+    import matplotlib.pyplot as plt
+    fig = plot_func(data, **(params or {}))
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class RenderService:
+    def __init__(self, workers=None, cache_size=128, cache_dir=None):
+        self.workers = workers
+        self.cache_size = cache_size
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.RLock()
+        self._pool = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_use_agg)
+        return self._pool
+
+    def _disk_path(self, key, fmt):
+        return os.path.join(self.cache_dir, f"{key}.{fmt}")
+
+    def _lookup(self, key, fmt):
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        if self.cache_dir and os.path.exists(self._disk_path(key, fmt)):
+            with open(self._disk_path(key, fmt), 'rb') as f:
+                image = f.read()
+            self._store(key, fmt, image, write_disk=False)
+            return image
+        return None
+
+    def _store(self, key, fmt, image, write_disk=True):
+        with self._lock:
+            self._cache[key] = image
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self._pending.pop(key, None)
+        if write_disk and self.cache_dir:
+            with open(self._disk_path(key, fmt), 'wb') as f:
+                f.write(image)
+
+    def submit(self, plot_func, data, fmt='png', dpi=100, **params):
+        key = cache_key(plot_func, data, fmt, dpi, params)
+        with self._lock:
+            image = self._lookup(key, fmt)
+            if image is None and key in self._pending:
+                self.hits += 1
+                return self._pending[key]
+            if image is not None:
+                self.hits += 1
+                future = Future()
+                future.set_result(image)
+                return future
+            self.misses += 1
+            if self.workers == 0:
+                future = Future()
+                self._pending[key] = future
+            else:
+                future = self._executor().submit(render_figure, plot_func, data, fmt, dpi, params)
+                self._pending[key] = future
+        if self.workers == 0:
+            try:
+                image = render_figure(plot_func, data, fmt, dpi, params)
+            except Exception as e:
+                with self._lock:
+                    self._pending.pop(key, None)
+                future.set_exception(e)
+                return future
+            self._store(key, fmt, image)
+            future.set_result(image)
+        else:
+            future.add_done_callback(
+                lambda f: self._store(key, fmt, f.result()) if f.exception() is None
+                else self._pending.pop(key, None))
+        return future
+
+    def render(self, plot_func, data, fmt='png', dpi=100, **params):
+        return self.submit(plot_func, data, fmt=fmt, dpi=dpi, **params).result()
+
+    def render_many(self, jobs, fmt='png', dpi=100):
+        futures = [self.submit(plot_func, data, fmt=fmt, dpi=dpi, **params)
+                   for plot_func, data, params in jobs]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
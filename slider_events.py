@@ -0,0 +1,198 @@
+"""
+Коалесценція подій віджетів matplotlib.
+
+Кожен крок перетягування слайдера лише записує нові параметри. Обчислення
+виконується у фоновому потоці після паузи (debounce) або не рідше ніж раз на
+max_wait секунд (throttle), а в GUI-потоці застосовується тільки найновіший
+готовий результат: змінені артисти перемальовуються через blitting замість
+повного draw_idle.
+
+Слайдери передаються як widgets: їм вимикається drawon, а рухомі частини
+(смуга значення, ручка, текст) теж малюються через blit, тож крок
+перетягування не викликає повного перемальовування фігури. Віджети лежать в
+окремому шарі поверх фону: у кадрі відновлюється і перемальовується лише
+область слайдера, значення якого змінилось. Час кожного кадру пишеться в
+instrument (slider.frame), кадри довші за FRAME_BUDGET рахуються в
+slider.frame_over_budget.
+"""
+
+import threading
+import time
+
+import numpy as np
+from matplotlib.transforms import Bbox
+
+from instrument import count, record_time, timer
+
+# 60 кадрів на секунду.
+FRAME_BUDGET = 0.016
+
+
+def _moving_parts(widget):
+    return [artist for artist in (getattr(widget, name, None) for name in ('poly', '_handle', 'valtext'))
+            if artist is not None]
+
+
+class DebouncedUpdater:
+    def __init__(self, fig, read_params, compute, apply, artists, widgets=(),
+                 delay=0.03, max_wait=0.1, poll_interval=10):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.read_params = read_params
+        self.compute = compute
+        self.apply = apply
+        self.artists = list(artists)
+        # Рамка і підпис слайдера лишаються у фоні, перемальовуються лише
+        # частини, що рухаються разом зі значенням.
+        self.widgets = list(widgets)
+        self.widget_artists = [artist for widget in self.widgets for artist in _moving_parts(widget)]
+        for widget in self.widgets:
+            widget.drawon = False
+        self.delay = delay
+        self.max_wait = max_wait
+        self.frame_time = 0.0
+
+        self._cond = threading.Condition()
+        self._requested = 0
+        self._params = None
+        self._first_request = None
+        self._last_request = 0.0
+        self._result = None
+        self._applied = 0
+        self._background = None
+        self._layer = None
+        self._regions = []
+        self._drawn_values = []
+        self._dirty = False
+
+        for artist in self.artists + self.widget_artists:
+            artist.set_animated(True)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('close_event', self._on_close)
+
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        self._timer = self.canvas.new_timer(interval=poll_interval)
+        self._timer.add_callback(self._poll)
+        self._timer.start()
+
+    def __call__(self, val=None):
+        # Викликається з GUI-потоку: лише знімок стану віджетів, без обчислень.
+        count('slider.events')
+        self._dirty = True
+        params = self.read_params()
+        now = time.monotonic()
+        with self._cond:
+            self._requested += 1
+            self._params = params
+            self._last_request = now
+            if self._first_request is None:
+                self._first_request = now
+            self._cond.notify()
+
+    def _run(self):
+        done = 0
+        while True:
+            with self._cond:
+                while self._requested == done:
+                    self._cond.wait()
+                while True:
+                    now = time.monotonic()
+                    quiet = self._last_request + self.delay - now
+                    overdue = self._first_request + self.max_wait - now
+                    remaining = min(quiet, overdue)
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                generation = self._requested
+                params = self._params
+                self._first_request = None
+            try:
+                with timer('slider.compute'):
+                    result = self.compute(params)
+            except Exception as e:
+                print(f"Помилка обчислення оновлення: {e}")
+                result = None
+            done = generation
+            if result is None:
+                continue
+            with self._cond:
+                if self._result is None or self._result[0] < generation:
+                    self._result = (generation, result)
+
+    def _poll(self):
+        # Таймер GUI-потоку: новий результат або зміна самого віджета — один кадр.
+        with self._cond:
+            item, self._result = self._result, None
+        fresh = item is not None and item[0] > self._applied
+        if not fresh and not self._dirty:
+            return
+        start = time.perf_counter_ns()
+        self._dirty = False
+        if fresh:
+            self._applied = item[0]
+            self.apply(item[1])
+        self._blit()
+        elapsed = time.perf_counter_ns() - start
+        record_time('slider.frame', elapsed)
+        self.frame_time = elapsed / 1e9
+        if self.frame_time > FRAME_BUDGET:
+            count('slider.frame_over_budget')
+
+    def _blit(self):
+        if self._layer is None or not self.canvas.supports_blit:
+            self.canvas.draw_idle()
+            return
+        changed = [i for i, widget in enumerate(self.widgets) if widget.val != self._drawn_values[i]]
+        if changed:
+            # Сусід, що перекривається з відновленою областю, теж стирається.
+            changed = [j for j, region in enumerate(self._regions)
+                       if j in changed or any(region.overlaps(self._regions[i]) for i in changed)]
+        self.canvas.restore_region(self._layer)
+        if changed:
+            height = self.fig.bbox.height
+            for i in changed:
+                # Регіони буфера рахуються від верхнього лівого кута, xy — початок
+                # збереженого фону (уся фігура), а не області.
+                x0, y0, x1, y1 = self._regions[i].extents
+                self.canvas.restore_region(self._background, (x0, height - y1, x1, height - y0), (0, 0))
+            for i in changed:
+                self._draw_widget(i)
+            self._layer = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+        self.canvas.flush_events()
+
+    def _draw_widget(self, i):
+        for artist in _moving_parts(self.widgets[i]):
+            self.fig.draw_artist(artist)
+        self._drawn_values[i] = self.widgets[i].val
+
+    def _widget_region(self, widget, renderer):
+        # До правого краю фігури: текст значення праворуч від осей і його
+        # ширина змінюється разом зі значенням. Ручка на краю діапазону виходить
+        # за межу осей на свою ширину.
+        box = Bbox.union([widget.ax.bbox] + [artist.get_window_extent(renderer)
+                                             for artist in _moving_parts(widget)])
+        handle = getattr(widget, '_handle', None)
+        pad = (handle.get_window_extent(renderer).width if handle is not None else 0) + 2
+        return Bbox.from_extents(np.floor(widget.ax.bbox.x0 - pad), np.floor(box.y0) - 2,
+                                 self.fig.bbox.x1, np.ceil(box.y1) + 2)
+
+    def _on_draw(self, event):
+        # Після повного перемальовування (resize, reset) оновлюємо фон і шар
+        # віджетів для blitting.
+        self._drawn_values = [None] * len(self.widgets)
+        self._regions = [self._widget_region(widget, event.renderer) for widget in self.widgets]
+        if self.canvas.supports_blit:
+            self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for i in range(len(self.widgets)):
+            self._draw_widget(i)
+        if self.canvas.supports_blit:
+            self._layer = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+
+    def _on_close(self, event):
+        self._timer.stop()
@@ -0,0 +1,147 @@
+"""
+Синтетичні вхідні дані у форматах реальних джерел.
+
+Потрібні бенчмаркам (bench_suite.py), заглушці NOAA і будь-якій локальній
+перевірці без файлів з D:\\AD\\...:
+    vhi_csv / write_vhi_csvs — CSV NOAA для N областей × Y років (HTML-обгортка,
+        -1 замість пропусків); аномалії мають AR(1)-пам'ять, тож трапляються
+        багатотижневі посухи, як у справжніх рядах;
+    write_power_file — household_power_consumption.txt заданої кількості
+        рядків (';', дати без нулів на початку, '?' у пропущених хвилинах);
+    write_mpg_file — таблиця у форматі auto-mpg.data ('?' у horsepower).
+Усе детерміноване: однаковий seed дає однакові байти.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+WEEKS_PER_YEAR = 52
+POWER_START = '2006-12-16 17:24:00'
+
+
+def _ar1(rng, n, phi, scale):
+    shocks = rng.normal(0.0, scale, n)
+    out = np.empty(n)
+    level = 0.0
+    for i in range(n):
+        level = phi * level + shocks[i]
+        out[i] = level
+    return out
+
+
+def vhi_frame(province_id, start_year=1981, end_year=2024, seed=0, missing_rate=0.01):
+    rng = np.random.default_rng([seed, province_id])
+    n_years = end_year - start_year + 1
+    year = np.repeat(np.arange(start_year, end_year + 1), WEEKS_PER_YEAR)
+    week = np.tile(np.arange(1, WEEKS_PER_YEAR + 1), n_years)
+    n = len(year)
+
+    season = np.sin(2 * np.pi * (week - 10) / WEEKS_PER_YEAR)
+    anomaly = _ar1(rng, n, 0.9, 5.0)
+    vci = np.clip(50 + 15 * season + 2.0 * anomaly + rng.normal(0, 8, n), 0, 100)
+    tci = np.clip(50 - 8 * season + 1.5 * anomaly + rng.normal(0, 8, n), 0, 100)
+    df = pd.DataFrame({
+        'year': year,
+        'week': week,
+        'smn': np.clip(0.05 + 0.005 * vci + rng.normal(0, 0.03, n), 0, 1),
+        'smt': 275 + 15 * season + rng.normal(0, 3, n),
+        'vci': vci,
+        'tci': tci,
+        'vhi': (vci + tci) / 2,
+    })
+    missing = rng.random(n) < missing_rate
+    df.loc[missing, ['smn', 'smt', 'vci', 'tci', 'vhi']] = -1.0
+    return df
+
+
+def vhi_csv(province_id, start_year=1981, end_year=2024, seed=0):
+    df = vhi_frame(province_id, start_year, end_year, seed)
+    lines = [f"<tt><pre><b>Province= {province_id}: synthetic</b>", "year,week, SMN,SMT,VCI,TCI, VHI<br>"]
+    lines += [f"{y},{w:3d},{smn:6.3f},{smt:6.2f},{vci:6.2f},{tci:6.2f},{vhi:6.2f},"
+              for y, w, smn, smt, vci, tci, vhi in df.itertuples(index=False)]
+    lines.append("</pre></tt>")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def write_vhi_csvs(directory, n_provinces=25, start_year=1981, end_year=2024, seed=0,
+                   timestamp='20250101_000000'):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for province_id in range(1, n_provinces + 1):
+        path = os.path.join(directory, f'vhi_id_{province_id}_{timestamp}.csv')
+        with open(path, 'wb') as f:
+            f.write(vhi_csv(province_id, start_year, end_year, seed))
+        paths.append(path)
+    return paths
+
+
+def power_frame(rows, missing_rate=0.0125, seed=0, start=POWER_START):
+    rng = np.random.default_rng(seed)
+    minutes = np.datetime64(start, 'm') + np.arange(rows)
+    days = minutes.astype('datetime64[D]')
+    minute_of_day = (minutes - days).astype(np.int64)
+
+    # Рядки дат і часу будуються лише для унікальних значень.
+    unique_days, day_codes = np.unique(days, return_inverse=True)
+    day_labels = [f"{d.day}/{d.month}/{d.year}" for d in pd.DatetimeIndex(unique_days)]
+    time_labels = [f"{m // 60:02d}:{m % 60:02d}:00" for m in range(24 * 60)]
+
+    hour = minute_of_day / 60
+    profile = 0.4 + 1.2 * np.exp(-((hour - 20) / 2.5) ** 2) + 0.6 * np.exp(-((hour - 8) / 1.5) ** 2)
+    active = np.clip(profile * rng.lognormal(0, 0.5, rows), 0.076, 11.1)
+    voltage = np.clip(rng.normal(240.8, 3.2, rows), 223.2, 254.1)
+    sub_3 = np.where(rng.random(rows) < 0.45, rng.integers(16, 20, rows), rng.integers(0, 2, rows))
+    df = pd.DataFrame({
+        'Date': pd.Categorical.from_codes(day_codes, categories=day_labels),
+        'Time': pd.Categorical.from_codes(minute_of_day, categories=time_labels),
+        'Global_active_power': active.round(3),
+        'Global_reactive_power': np.clip(np.abs(rng.normal(0.12, 0.11, rows)), 0, 1.39).round(3),
+        'Voltage': voltage.round(2),
+        'Global_intensity': np.clip(active * 1000 / voltage + rng.normal(0, 0.3, rows), 0.2, 48.4).round(1),
+        'Sub_metering_1': np.where(rng.random(rows) < 0.08, rng.integers(1, 40, rows), 0).astype(np.float64),
+        'Sub_metering_2': np.where(rng.random(rows) < 0.15, rng.integers(1, 40, rows), 0).astype(np.float64),
+        'Sub_metering_3': sub_3.astype(np.float64),
+    })
+    missing = rng.random(rows) < missing_rate
+    df.loc[missing, df.columns[2:]] = np.nan
+    return df
+
+
+def write_power_file(path, rows, missing_rate=0.0125, seed=0):
+    power_frame(rows, missing_rate, seed).to_csv(path, sep=';', index=False, na_rep='?', float_format='%.3f')
+    return path
+
+
+def mpg_frame(rows, missing_rate=0.015, seed=0):
+    rng = np.random.default_rng(seed)
+    cylinders = rng.choice([3, 4, 5, 6, 8], size=rows, p=[0.01, 0.51, 0.01, 0.21, 0.26])
+    displacement = np.clip(cylinders * 42 + rng.normal(0, 20, rows), 68, 455)
+    horsepower = np.clip(displacement * 0.45 + 20 + rng.normal(0, 12, rows), 46, 230)
+    weight = np.clip(1200 + displacement * 8 + rng.normal(0, 250, rows), 1613, 5140)
+    model_year = rng.integers(70, 83, rows)
+    mpg = np.clip(58 - weight / 160 + (model_year - 70) * 0.7 + rng.normal(0, 3, rows), 9, 46.6)
+    df = pd.DataFrame({
+        'mpg': mpg.round(1),
+        'cylinders': cylinders,
+        'displacement': displacement.round(1),
+        'horsepower': horsepower.round(1),
+        'weight': weight.round(0),
+        'acceleration': np.clip(22 - horsepower / 20 + rng.normal(0, 1.5, rows), 8, 24.8).round(1),
+        'model_year': model_year,
+        'origin': rng.choice([1, 2, 3], size=rows, p=[0.62, 0.18, 0.20]),
+        'car_name': [f"car {i}" for i in range(rows)],
+    })
+    df.loc[rng.random(rows) < missing_rate, 'horsepower'] = np.nan
+    return df
+
+
+def write_mpg_file(path, rows, missing_rate=0.015, seed=0):
+    df = mpg_frame(rows, missing_rate, seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in df.itertuples(index=False):
+            horsepower = '?' if np.isnan(row.horsepower) else f"{row.horsepower:.1f}"
+            f.write(f"{row.mpg:.1f} {row.cylinders} {row.displacement:.1f} {horsepower} {row.weight:.1f} "
+                    f"{row.acceleration:.1f} {row.model_year} {row.origin} \"{row.car_name}\"\n")
+    return path
@@ -0,0 +1,99 @@
+import os
+import time
+
+import pytest
+
+from download_queue import DownloadQueue, format_report
+from noaa_stub import start_stub
+from vhi_ingest import build_url
+from vhi_schema import parse_vhi_csv
+
+FAST = dict(workers=2, rate=100.0, base_delay=0.01, max_delay=0.05)
+
+
+@pytest.fixture
+def stub():
+    server, base_url, faults = start_stub()
+    yield base_url, faults
+    server.shutdown()
+    server.server_close()
+
+
+def jobs(base_url, directory, provinces):
+    return [(f"UKR/Mean/{pid}", build_url('UKR', pid, 2000, 2001, base_url=base_url),
+             os.path.join(directory, f'vhi_id_{pid}.csv')) for pid in provinces]
+
+
+def attempts(queue, run_id):
+    return queue.conn.execute("SELECT key, attempt, error FROM attempts WHERE run_id = ? ORDER BY key, attempt",
+                              (run_id,)).fetchall()
+
+
+def test_server_errors_are_retried(stub, tmp_path):
+    base_url, faults = stub
+    faults.fail_first = 2
+    queue = DownloadQueue(str(tmp_path / 'downloads.sqlite'))
+    queue.enqueue('run', jobs(base_url, tmp_path, [1, 2]))
+    assert queue.run('run', max_attempts=5, **FAST) == 0
+
+    rows = attempts(queue, 'run')
+    assert [(key, attempt) for key, attempt, _ in rows] == [(f"UKR/Mean/{pid}", n) for pid in (1, 2) for n in (1, 2, 3)]
+    assert all(error in ('HTTP 500', 'HTTP 503') for _, attempt, error in rows if attempt < 3)
+    assert all(error is None for _, attempt, error in rows if attempt == 3)
+    report = queue.report('run')
+    assert [(row['status'], row['attempts'], row['requests'], row['errors']) for row in report] == [('done', 3, 3, 2)] * 2
+    assert 'done: 2' in format_report(report)
+    queue.close()
+    assert len(parse_vhi_csv(str(tmp_path / 'vhi_id_1.csv'), 1)[0]) == 104
+
+
+def test_retry_after_and_deadline(stub, tmp_path):
+    base_url, faults = stub
+    faults.throttle_rate = 1.0
+    faults.retry_after = 30
+    queue = DownloadQueue(str(tmp_path / 'downloads.sqlite'))
+    queue.enqueue('run', jobs(base_url, tmp_path, [1]))
+    start = time.monotonic()
+    # Retry-After обрізається до max_delay, тож тут ліміт більший за 30 с сервера.
+    assert queue.run('run', max_attempts=5, deadline=0.5, **{**FAST, 'max_delay': 60.0}) == 1
+    assert time.monotonic() - start < 5
+
+    assert attempts(queue, 'run') == [('UKR/Mean/1', 1, 'HTTP 429')]
+    status, next_attempt_at = queue.conn.execute("SELECT status, next_attempt_at FROM jobs").fetchone()
+    assert status == 'pending'
+    assert next_attempt_at - time.time() > 25
+    [row] = queue.report('run')
+    assert (row['status'], row['attempts'], row['errors'], row['last_error']) == ('pending', 1, 1, 'HTTP 429')
+    queue.close()
+
+
+def test_resume_after_crash(stub, tmp_path):
+    base_url, faults = stub
+    db_path = str(tmp_path / 'downloads.sqlite')
+    queue = DownloadQueue(db_path)
+    queue.enqueue('run', jobs(base_url, tmp_path, [1, 2]))
+    assert queue.run('run', **FAST) == 0
+    # Процес упав, поки завантажувалась область 2.
+    with queue.conn:
+        queue.conn.execute("UPDATE jobs SET status = 'running' WHERE key = 'UKR/Mean/2'")
+    queue.close()
+
+    requests = faults.requests
+    queue = DownloadQueue(db_path)
+    queue.enqueue('run', jobs(base_url, tmp_path, [1, 2, 3]))
+    assert queue.run('run', **FAST) == 0
+    assert faults.requests - requests == 2
+    assert [(row['key'], row['status'], row['requests']) for row in queue.report('run')] == [
+        ('UKR/Mean/1', 'done', 1), ('UKR/Mean/2', 'done', 2), ('UKR/Mean/3', 'done', 1)]
+    queue.close()
+
+
+def test_client_error_is_not_retried(stub, tmp_path):
+    base_url, _ = stub
+    queue = DownloadQueue(str(tmp_path / 'downloads.sqlite'))
+    queue.enqueue('run', [('bad', f"{base_url}?country=UKR", str(tmp_path / 'bad.csv'))])
+    assert queue.run('run', max_attempts=5, **FAST) == 1
+    [row] = queue.report('run')
+    assert (row['status'], row['attempts'], row['last_error']) == ('failed', 1, 'HTTP 400')
+    assert not os.path.exists(tmp_path / 'bad.csv')
+    queue.close()
@@ -0,0 +1,86 @@
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.widgets import Slider
+
+from filter_montecarlo import design_filter
+from slider_events import FRAME_BUDGET, DebouncedUpdater
+
+
+def wait_for_frame(update, applied, timeout=5.0):
+    # На Agg таймер не має циклу подій, тож кадри застосовуються вручну.
+    deadline = time.monotonic() + timeout
+    while update._applied == applied:
+        assert time.monotonic() < deadline, "воркер не повернув результат"
+        time.sleep(0.001)
+        update._poll()
+
+
+def test_blitted_frame_matches_full_draw():
+    fig, ax = plt.subplots()
+    fig.subplots_adjust(bottom=0.35)
+    line, = ax.plot(np.sin(np.linspace(0, 10, 100)))
+    sliders = [Slider(fig.add_axes([0.25, 0.05 + 0.05 * i, 0.65, 0.03]), f's{i}', 0.1, 2.0, valinit=1.0,
+                      valfmt='%1.2f') for i in range(4)]
+    update = DebouncedUpdater(fig, lambda: None, lambda params: None, lambda result: None, [line],
+                              widgets=sliders)
+    fig.canvas.draw()
+    # Крайні значення: ручка виходить за межі осей, текст змінює ширину.
+    for i, val in [(0, 0.1), (1, 2.0), (0, 1.37), (3, 0.1), (2, 1.5)]:
+        sliders[i].set_val(val)
+        line.set_ydata(np.cos(np.linspace(0, val, 100)))
+        update._dirty = True
+        update._poll()
+    blitted = np.asarray(fig.canvas.buffer_rgba()).copy()
+    update._timer.stop()
+    fig.canvas.draw()
+    full = np.asarray(fig.canvas.buffer_rgba())
+    plt.close(fig)
+    np.testing.assert_array_equal(blitted, full)
+
+
+def test_drag_is_blitted_within_frame_budget():
+    from scipy.signal import filtfilt
+
+    t = np.linspace(0, 10, 1000)
+    fig, ax = plt.subplots()
+    fig.subplots_adjust(bottom=0.35)
+    line, = ax.plot(t, np.sin(t))
+    filtered, = ax.plot(t, np.sin(t))
+    sliders = [Slider(fig.add_axes([0.25, 0.05 + 0.05 * i, 0.65, 0.03]), f's{i}', 0.1, 2.0, valinit=1.0,
+                      valfmt='%1.2f') for i in range(4)]
+
+    def compute(params):
+        clean = params[0] * np.sin(2 * np.pi * params[1] * t) + np.random.normal(0, 0.3, t.shape)
+        return clean, filtfilt(*design_filter('butterworth', 5.0, 5), clean)
+
+    def apply(result):
+        line.set_ydata(result[0])
+        filtered.set_ydata(result[1])
+
+    update = DebouncedUpdater(fig, lambda: [slider.val for slider in sliders], compute, apply,
+                              [line, filtered], widgets=sliders, delay=0.0, max_wait=0.0)
+    for slider in sliders:
+        slider.on_changed(update)
+    fig.canvas.draw()
+
+    full_draws = []
+    fig.canvas.draw = lambda *args: full_draws.append(args)
+    frames = []
+    for step in range(30):
+        applied = update._applied
+        sliders[step % len(sliders)].set_val(0.1 + step * 0.05)
+        wait_for_frame(update, applied)
+        frames.append(update.frame_time)
+    plt.close(fig)
+
+    assert not full_draws
+    # Перші кадри заповнюють кеші шрифтів і шляхів; медіана, а не максимум, бо
+    # одиничні паузи GC чи планувальника не є регресією.
+    frame = np.median(frames[5:])
+    assert frame < FRAME_BUDGET, f"кадр {frame * 1e3:.1f} мс"
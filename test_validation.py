@@ -0,0 +1,30 @@
+import io
+
+import pandas as pd
+
+from validation import Rule, validate_frame
+
+RULES = [Rule('Date', format='%d/%m/%Y'), Rule('Time', 'timedelta64[ns]'), Rule('value', lo=0, hi=10)]
+
+
+def read(text):
+    return pd.read_csv(io.StringIO(text), sep=';', na_values=['?'])
+
+
+def test_empty_temporal_cells_are_missing():
+    # Останнє унікальне значення коректне: раніше ним заповнювались порожні клітинки.
+    df = read("Date;Time;value\n2/1/2007;00:02:00;1\n;00:03:00;1\n2/1/2007;;1\n3/1/2007;00:05:00;1\n")
+    clean, report = validate_frame(df, RULES)
+    assert report['quarantined'] == 2
+    assert report['problems'] == {'Date:missing': 1, 'Time:missing': 1}
+    assert list(clean['Date']) == [pd.Timestamp('2007-01-02'), pd.Timestamp('2007-01-03')]
+    assert list(clean['Time']) == [pd.Timedelta(minutes=2), pd.Timedelta(minutes=5)]
+
+
+def test_unparseable_temporal_cells_are_quarantined(tmp_path):
+    df = read("Date;Time;value\n32/13/2007;00:02:00;1\n2/1/2007;xx;1\n2/1/2007;00:04:00;1\n")
+    clean, report = validate_frame(df, RULES, source='power.txt', quarantine_dir=tmp_path)
+    assert report['problems'] == {'Date:parse': 1, 'Time:parse': 1}
+    assert len(clean) == 1
+    bad = pd.read_csv(report['quarantine_path'])
+    assert list(bad['_reason']) == ['Date:parse', 'Time:parse']
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from synthetic_data import vhi_frame
+from vhi_aggregates import RegionAggregates
+from vhi_cube import VhiCube
+
+
+@pytest.fixture(scope='module')
+def frame():
+    return pd.concat([vhi_frame(pid, 2000, 2010).assign(provinceid=pid) for pid in (1, 2, 4)], ignore_index=True)
+
+
+def expected(frame, year_range, weeks):
+    rows = frame[frame['year'].between(*year_range) & frame['week'].isin(weeks) & (frame['vhi'] >= 0)]
+    grouped = rows.groupby('provinceid')['vhi']
+    return pd.DataFrame({'mean': grouped.mean(),
+                         **{f'p{q}': grouped.apply(lambda v: np.percentile(v, q)) for q in (25, 50, 75)}})
+
+
+@pytest.mark.parametrize('year_range, week_range, weeks', [
+    ((2003, 2003), None, range(1, 53)),
+    ((2000, 2010), None, range(1, 53)),
+    ((2001, 2004), (10, 20), range(10, 21)),
+    ((2001, 2004), (49, 9), [*range(49, 53), *range(1, 10)]),
+])
+def test_summary_matches_exact_percentiles(frame, year_range, week_range, weeks):
+    # Перцентилі не повинні залежати від того, чи повзунок тижнів на повному діапазоні.
+    summary = RegionAggregates(VhiCube(frame)).summary('vhi', year_range, week_range).set_index('provinceid')
+    exact = expected(frame, year_range, weeks)
+    np.testing.assert_allclose(summary['mean'], exact['mean'], rtol=1e-5)
+    np.testing.assert_allclose(summary['p25'], exact['p25'], rtol=1e-5)
+    np.testing.assert_allclose(summary['median'], exact['p50'], rtol=1e-5)
+    np.testing.assert_allclose(summary['p75'], exact['p75'], rtol=1e-5)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from synthetic_data import vhi_frame
+from vhi_anomaly import REFERENCE_YEAR, ClimatologyEngine
+
+
+@pytest.fixture(scope='module')
+def frame():
+    frames = [vhi_frame(pid, 2000, 2010).assign(provinceid=pid) for pid in (1, 2)]
+    # Область 3 з'являється лише в пізніших роках.
+    frames.append(vhi_frame(3, 2006, 2010).assign(provinceid=3))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_incremental_update_matches_full_fit(frame):
+    full = ClimatologyEngine().fit(frame)
+    incremental = ClimatologyEngine()
+    # Перекриття 2004-2005 надіслано повторно: last_key має його пропустити.
+    for years in [(2000, 2005), (2004, 2007), (2008, 2008), (2009, 2010)]:
+        incremental.update(frame[frame['year'].between(*years)])
+
+    np.testing.assert_array_equal(incremental.provinces, full.provinces)
+    np.testing.assert_array_equal(incremental.last_key, full.last_key)
+    np.testing.assert_array_equal(incremental.count, full.count)
+    np.testing.assert_allclose(incremental.total, full.total)
+    np.testing.assert_allclose(incremental.total_sq, full.total_sq)
+    np.testing.assert_allclose(incremental.trend_stats, full.trend_stats)
+    pd.testing.assert_frame_equal(incremental.trends(), full.trends())
+
+
+def test_climatology_matches_groupby(frame):
+    climatology = ClimatologyEngine().fit(frame).climatology().set_index(['provinceid', 'week'])
+    valid = frame[frame['vhi'] >= 0]
+    grouped = valid.groupby(['provinceid', 'week'])['vhi']
+    expected = climatology.loc[grouped.mean().index]
+    np.testing.assert_allclose(expected['mean'], grouped.mean(), rtol=1e-9)
+    np.testing.assert_allclose(expected['std'], grouped.std(), rtol=1e-6)
+    np.testing.assert_array_equal(expected['count'], grouped.size())
+
+
+def test_batched_trends_match_polyfit(frame):
+    trends = ClimatologyEngine().fit(frame).trends().set_index('provinceid')
+    for pid, rows in frame[frame['vhi'] >= 0].groupby('provinceid'):
+        t = (rows['year'] - REFERENCE_YEAR) + (rows['week'] - 1) / 52
+        slope, level = np.polyfit(t, rows['vhi'], 1)
+        assert trends.loc[pid, 'slope_per_year'] == pytest.approx(slope, rel=1e-6)
+        assert trends.loc[pid, f'level_{REFERENCE_YEAR}'] == pytest.approx(level, rel=1e-6)
+        assert trends.loc[pid, 'n'] == len(rows)
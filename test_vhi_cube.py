@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from synthetic_data import vhi_frame
+from vhi_cube import VhiCube, add_dates
+
+
+@pytest.fixture(scope='module')
+def frame():
+    frames = [vhi_frame(pid, 2000, 2010).assign(provinceid=pid) for pid in (1, 3, 5)]
+    return add_dates(pd.concat(frames, ignore_index=True))
+
+
+@pytest.fixture(scope='module')
+def cube(frame):
+    return VhiCube(frame)
+
+
+def valid_rows(frame, provinces, years, weeks):
+    rows = frame[frame['provinceid'].isin(provinces) & frame['year'].between(*years)
+                 & frame['week'].isin(weeks) & (frame['vhi'] >= 0)]
+    return rows.sort_values(['provinceid', 'date']).reset_index(drop=True)
+
+
+def test_week_window_wraps_new_year(frame, cube):
+    weeks = [*range(49, 53), *range(1, 10)]
+    series = cube.series('vhi', [1, 5], (2001, 2003), (49, 9))
+    expected = valid_rows(frame, [1, 5], (2001, 2003), weeks)
+    np.testing.assert_array_equal(series['provinceid'], expected['provinceid'])
+    np.testing.assert_array_equal(series['date'], expected['date'])
+    np.testing.assert_allclose(series['mean'], expected['vhi'], rtol=1e-6)
+    # Дати в межах області відсортовані, хоч тижні 1-9 ідуть перед 49-52.
+    assert all(part['date'].is_monotonic_increasing for _, part in series.groupby('provinceid'))
+
+
+def test_wrapped_window_monthly_matches_groupby(frame, cube):
+    weeks = [*range(49, 53), *range(1, 10)]
+    series = cube.series('vhi', [3], (2004, 2006), (49, 9), level='monthly')
+    rows = valid_rows(frame, [3], (2004, 2006), weeks)
+    grouped = rows.groupby(rows['date'].dt.to_period('M'))['vhi']
+    np.testing.assert_allclose(series['mean'], grouped.mean(), rtol=1e-6)
+    np.testing.assert_allclose(series['min'], grouped.min(), rtol=1e-6)
+    np.testing.assert_allclose(series['max'], grouped.max(), rtol=1e-6)
+
+
+@pytest.mark.parametrize('year_range, years', [
+    ((1990, 1995), []),
+    ((2020, 2030), []),
+    ((1995, 2001), [2000, 2001]),
+    ((2009, 2030), [2009, 2010]),
+    ((1990, 2030), list(range(2000, 2011))),
+])
+def test_year_range_is_clamped(cube, year_range, years):
+    series = cube.series('vhi', [1], year_range, level='yearly')
+    assert list(pd.DatetimeIndex(series['date']).year) == years
+    wrapped = cube.series('vhi', [1], year_range, (49, 9), level='yearly')
+    assert list(pd.DatetimeIndex(wrapped['date']).year) == years
+
+
+@pytest.mark.parametrize('provinces, expected', [
+    ([7], []),
+    ([2], []),
+    ([1, 2, 7], [1]),
+    ([5, 0, 3], [5, 3]),
+])
+def test_unknown_province_ids_are_dropped(frame, cube, provinces, expected):
+    series = cube.series('vhi', provinces, (2002, 2002), level='yearly')
+    assert list(series['provinceid']) == expected
+    for pid, mean in zip(series['provinceid'], series['mean']):
+        assert mean == pytest.approx(valid_rows(frame, [pid], (2002, 2002), range(1, 53))['vhi'].mean(), rel=1e-6)
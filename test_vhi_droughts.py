@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from vhi_droughts import detect_episodes
+
+
+def frame(values, provinceid=1, year=2000, first_week=1):
+    weeks = np.arange(first_week, first_week + len(values))
+    return pd.DataFrame({'provinceid': provinceid, 'year': year + (weeks - 1) // 52,
+                         'week': (weeks - 1) % 52 + 1, 'vhi': values})
+
+
+def test_missing_week_breaks_episode():
+    # -1 (пропуск NOAA) і NaN менші за поріг, але посушливими тижнями не є.
+    episodes = detect_episodes(frame([40, 10, 12, -1, 8, 9, 11, 40, np.nan, 40]), threshold=15)
+    assert list(episodes['onset_week']) == [2, 5]
+    assert list(episodes['duration']) == [2, 3]
+    assert list(episodes['min_value']) == [10, 8]
+    np.testing.assert_allclose(episodes['severity'], [5 + 3, 7 + 6 + 4])
+
+
+def test_episode_spans_new_year():
+    episodes = detect_episodes(frame([40, 10, 10, 10, 40], first_week=50), threshold=15)
+    assert len(episodes) == 1
+    assert tuple(episodes.loc[0, ['onset_year', 'onset_week', 'end_year', 'end_week', 'duration']]) == \
+        (2000, 51, 2001, 1, 3)
+
+
+def test_extent_counts_valid_provinces_only():
+    df = pd.concat([frame([10, 10, 10], provinceid=1), frame([10, -1, 10], provinceid=2)], ignore_index=True)
+    episodes = detect_episodes(df, threshold=15)
+    assert list(episodes['provinceid']) == [1, 2, 2]
+    assert list(episodes['extent']) == [2, 2, 2]
@@ -0,0 +1,160 @@
+"""
+Валідація рядків під час розбору: типи, діапазони, карантин.
+
+Фрейм, щойно прочитаний read_csv, перевіряється одним векторним проходом за
+списком правил Rule: стовпець приводиться до числа (дати, часу) лише якщо
+read_csv не зміг зробити це сам, значення-заглушки (наприклад -1 у NOAA)
+стають пропусками, а рядки з нерозбірними, відсутніми обов'язковими чи
+позадіапазонними значеннями відкидаються. Відкинуті рядки з причинами
+пишуться в <quarantine_dir>/<ім'я джерела>.bad.csv, а лічильники — у звіт і
+в instrument (validation.rows, validation.quarantined, validation.<причина>).
+Чисті рядки повертаються вже з цільовими dtype, без повторного розбору.
+
+Приклад:
+    rules = [Rule('week', 'int8', lo=1, hi=52), Rule('vhi', 'float32', 0, 100, required=False, missing=(-1,))]
+    df, report = validate_frame(pd.read_csv(path), rules, source=path, quarantine_dir='quarantine')
+    print(format_validation([report]))
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from instrument import count
+
+
+class Rule:
+    def __init__(self, column, dtype='float64', lo=None, hi=None, required=True, missing=(), format=None):
+        self.column = column
+        self.dtype = dtype
+        self.lo = lo
+        self.hi = hi
+        self.required = required
+        self.missing = tuple(missing)
+        self.format = format
+
+    @property
+    def is_temporal(self):
+        return self.format is not None or str(self.dtype).startswith(('datetime', 'timedelta'))
+
+
+def _coerce(raw, rule):
+    """(масив значень, маска нерозбірних) — повторне перетворення лише для «брудних» стовпців."""
+    if rule.is_temporal:
+        if pd.api.types.is_datetime64_any_dtype(raw) or pd.api.types.is_timedelta64_dtype(raw):
+            return raw.to_numpy(), None
+        # Дат і часів доби зазвичай на порядки менше, ніж рядків: розбираємо
+        # лише унікальні рядки і розкладаємо результат за кодами.
+        codes, uniques = pd.factorize(raw)
+        if str(rule.dtype).startswith('timedelta'):
+            parsed = pd.to_timedelta(uniques, errors='coerce')
+        else:
+            parsed = pd.to_datetime(uniques, format=rule.format, errors='coerce')
+        # Код -1 — пропуск у вихідних даних; без fill_value take узяв би останнє значення.
+        values = parsed.take(codes, allow_fill=True, fill_value=pd.NaT).to_numpy()
+        return values, np.isnat(values) & (codes >= 0)
+    if pd.api.types.is_numeric_dtype(raw):
+        return raw.to_numpy(), None
+    values = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return values, np.isnan(values) & raw.notna().to_numpy()
+
+
+def _isna(values):
+    if values.dtype.kind in 'mM':
+        return np.isnat(values)
+    if values.dtype.kind == 'f':
+        return np.isnan(values)
+    return np.zeros(len(values), dtype=bool)
+
+
+def quarantine_path(quarantine_dir, source):
+    return os.path.join(quarantine_dir, os.path.basename(str(source)) + '.bad.csv')
+
+
+def validate_frame(df, rules, source='frame', quarantine_dir=None):
+    """Повертає (чистий типізований фрейм, звіт)."""
+    n_rows = len(df)
+    bad = np.zeros(n_rows, dtype=bool)
+    problems = {}
+    columns = {}
+    for rule in rules:
+        if rule.column not in df.columns:
+            if rule.required:
+                raise ValueError(f"{source}: немає обов'язкового стовпця {rule.column}")
+            continue
+        values, failed = _coerce(df[rule.column], rule)
+        if rule.missing:
+            values = values.astype(np.float64, copy=False)
+            values = np.where(np.isin(values, rule.missing), np.nan, values)
+
+        masks = {'parse': failed}
+        if rule.required:
+            missing = _isna(values)
+            masks['missing'] = missing if failed is None else missing & ~failed
+        if not rule.is_temporal and (rule.lo is not None or rule.hi is not None):
+            # NaN не порівнюється ні з чим, тож пропуски тут не рахуються.
+            out = np.zeros(n_rows, dtype=bool)
+            if rule.lo is not None:
+                out |= values < rule.lo
+            if rule.hi is not None:
+                out |= values > rule.hi
+            masks['range'] = out
+        for reason, mask in masks.items():
+            n = int(mask.sum()) if mask is not None else 0
+            if n:
+                problems[f'{rule.column}:{reason}'] = (n, mask)
+                bad |= mask
+        columns[rule.column] = values if rule.is_temporal else (values, rule.dtype)
+
+    n_bad = int(bad.sum())
+    path = quarantine_path(quarantine_dir, source) if quarantine_dir else None
+    if path and n_bad:
+        reasons = np.full(n_bad, '', dtype=object)
+        for key, (_, mask) in problems.items():
+            reasons[mask[bad]] += key + ';'
+        os.makedirs(quarantine_dir, exist_ok=True)
+        df.loc[bad].assign(_reason=[r.rstrip(';') for r in reasons]).to_csv(path, index=False)
+    elif path and os.path.exists(path):
+        # Файл знову чистий — старий карантин уже не актуальний.
+        os.remove(path)
+
+    # Фрейм збирається один раз з готових масивів: фільтр і приведення типів
+    # ідуть у NumPy, без проміжних копій pandas на кожне правило.
+    keep = ~bad if n_bad else slice(None)
+    clean = {}
+    for name in df.columns:
+        if name not in columns:
+            clean[name] = df[name].array[keep]
+        elif isinstance(columns[name], tuple):
+            values, dtype = columns[name]
+            clean[name] = values[keep].astype(dtype, copy=False)
+        else:
+            clean[name] = columns[name][keep]
+    clean = pd.DataFrame(clean, copy=False)
+
+    count('validation.rows', n_rows)
+    count('validation.quarantined', n_bad)
+    for key, (n, _) in problems.items():
+        count(f"validation.{key.split(':')[1]}", n)
+    report = {
+        'source': str(source),
+        'rows': n_rows,
+        'valid': n_rows - n_bad,
+        'quarantined': n_bad,
+        'problems': {key: n for key, (n, _) in problems.items()},
+        'quarantine_path': path if n_bad else None,
+    }
+    return clean, report
+
+
+def format_validation(reports):
+    total = sum(report['rows'] for report in reports)
+    quarantined = sum(report['quarantined'] for report in reports)
+    lines = [f"Перевірено {total} рядків з {len(reports)} джерел(а), у карантині: {quarantined}"]
+    for report in reports:
+        if report['quarantined']:
+            details = ', '.join(f"{key} {n}" for key, n in sorted(report['problems'].items()))
+            where = f" -> {report['quarantine_path']}" if report['quarantine_path'] else ''
+            lines.append(f"  {os.path.basename(report['source'])}: {report['quarantined']} ({details}){where}")
+    return "\n".join(lines)
@@ -0,0 +1,78 @@
+"""
+Попередньо пораховані агрегати по областях для порівняння регіонів.
+
+Будуються один раз з куба VhiCube для кожного індексу (VHI/VCI/TCI):
+кумулятивні по тижнях кількість, сума та кількість посушливих тижнів
+[область, рік, тиждень+1]. Середнє і кількість посушливих тижнів для
+будь-якого діапазону років і тижнів виходять різницею префіксних сум.
+Медіана й перцентилі точні: nanpercentile по зрізу куба, який уже в пам'яті,
+а не по сирих рядках, — однаково для повного і неповного діапазону тижнів.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+DROUGHT_THRESHOLD = 15
+
+
+class RegionAggregates:
+    def __init__(self, cube, drought_threshold=DROUGHT_THRESHOLD):
+        self.cube = cube
+        self.drought_threshold = drought_threshold
+        self.partials = {index: self._build(cube.values[index]) for index in cube.indices}
+
+    def _build(self, values):
+        valid = ~np.isnan(values)
+        pad = [(0, 0), (0, 0), (1, 0)]
+        count = np.pad(np.cumsum(valid, axis=2, dtype=np.int32), pad)
+        total = np.pad(np.cumsum(np.where(valid, values, 0.0), axis=2, dtype=np.float64), pad)
+        drought = np.pad(np.cumsum(valid & (values < self.drought_threshold), axis=2, dtype=np.int32), pad)
+
+        return {'count': count, 'sum': total, 'drought': drought}
+
+    def _window(self, year_range, week_range):
+        years, n_weeks = self.cube.years, self.cube.n_weeks
+        y0, y1 = (0, len(years)) if year_range is None else (
+            max(year_range[0] - years[0], 0), max(year_range[1] - years[0] + 1, 0))
+        if week_range is None:
+            segments = [(0, n_weeks)]
+        elif week_range[0] > week_range[1]:
+            # Вікно через новий рік (наприклад, зима 49-9) — два відрізки тижнів.
+            segments = [(max(week_range[0] - 1, 0), n_weeks), (0, min(week_range[1], n_weeks))]
+        else:
+            segments = [(max(week_range[0] - 1, 0), min(week_range[1], n_weeks))]
+        return slice(y0, y1), segments
+
+    def summary(self, index, year_range=None, week_range=None, percentiles=(25, 50, 75)):
+        parts = self.partials[index]
+        years, segments = self._window(year_range, week_range)
+
+        def window_sum(name):
+            return sum((parts[name][:, years, w1] - parts[name][:, years, w0]).sum(axis=1) for w0, w1 in segments)
+
+        count = window_sum('count')
+        total = window_sum('sum')
+        drought = window_sum('drought')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+
+        values = self.cube.values[index]
+        window = np.concatenate([values[:, years, w0:w1] for w0, w1 in segments], axis=2)
+        window = window.reshape(len(self.cube.provinces), -1)
+        with warnings.catch_warnings():
+            # Область без жодного значення у вікні дає NaN, а не попередження.
+            warnings.simplefilter('ignore', RuntimeWarning)
+            qs = np.nanpercentile(window, percentiles, axis=1).T if window.shape[1] else \
+                np.full((len(self.cube.provinces), len(percentiles)), np.nan)
+
+        result = pd.DataFrame({
+            'provinceid': self.cube.provinces,
+            'count': count,
+            'mean': mean,
+            'drought_weeks': drought,
+        })
+        for j, q in enumerate(percentiles):
+            result['median' if q == 50 else f'p{q:g}'] = qs[:, j]
+        return result
@@ -0,0 +1,130 @@
+"""
+Кліматологія, аномалії та тренди VHI по областях.
+
+Кліматологія тижня року для всіх областей рахується одним np.bincount у
+масиви [область, тиждень] (кількість, сума, сума квадратів), аномалії та
+z-оцінки для всього фрейму — одним broadcast-індексуванням. Лінійні тренди
+для всіх областей розв'язуються одним пакетним викликом np.linalg.solve над
+нормальними рівняннями 2x2. Усі накопичувачі адитивні, тож update() додає
+лише нові тижні без перерахунку 40 років історії.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Час для трендів відраховується від цього року, щоб нормальні рівняння були добре обумовлені.
+REFERENCE_YEAR = 2000
+
+
+class ClimatologyEngine:
+    def __init__(self, index='vhi', n_weeks=52, province_col='provinceid'):
+        self.index = index
+        self.n_weeks = n_weeks
+        self.province_col = province_col
+        self.provinces = np.array([], dtype=np.int64)
+        self._alloc(0)
+
+    def _alloc(self, n):
+        self.count = np.zeros((n, self.n_weeks))
+        self.total = np.zeros((n, self.n_weeks))
+        self.total_sq = np.zeros((n, self.n_weeks))
+        # Достатні статистики для y = a + b*t по кожній області: n, St, Stt, Sy, Sty
+        self.trend_stats = np.zeros((n, 5))
+        self.last_key = np.full(n, -1, dtype=np.int64)
+
+    def _ensure_provinces(self, provinces):
+        new = np.setdiff1d(np.unique(provinces), self.provinces)
+        if not new.size:
+            return
+        merged = np.union1d(self.provinces, new)
+        old = np.searchsorted(merged, self.provinces)
+        arrays = {name: getattr(self, name) for name in ('count', 'total', 'total_sq', 'trend_stats', 'last_key')}
+        self._alloc(len(merged))
+        for name, values in arrays.items():
+            getattr(self, name)[old] = values
+        self.provinces = merged
+
+    def _rows(self, df):
+        values = df[self.index].to_numpy(dtype=np.float64)
+        week = df['week'].to_numpy().astype(np.int64)
+        valid = ~np.isnan(values) & (values >= 0) & (week >= 1) & (week <= self.n_weeks)
+        p = np.searchsorted(self.provinces, df[self.province_col].to_numpy())
+        year = df['year'].to_numpy().astype(np.int64)
+        return p, year, week - 1, values, valid
+
+    def fit(self, df):
+        self.provinces = np.array([], dtype=np.int64)
+        self._alloc(0)
+        return self.update(df)
+
+    def update(self, df):
+        if df.empty:
+            return self
+        self._ensure_provinces(df[self.province_col].to_numpy())
+        p, year, w, values, valid = self._rows(df)
+        key = year * 100 + w + 1
+        # Повторно надіслані тижні (не новіші за вже врахований) пропускаємо.
+        fresh = valid & (key > self.last_key[p])
+        p, year, w, values, key = p[fresh], year[fresh], w[fresh], values[fresh], key[fresh]
+
+        n_cells = len(self.provinces) * self.n_weeks
+        cell = p * self.n_weeks + w
+        self.count += np.bincount(cell, minlength=n_cells).reshape(self.count.shape)
+        self.total += np.bincount(cell, weights=values, minlength=n_cells).reshape(self.total.shape)
+        self.total_sq += np.bincount(cell, weights=values ** 2, minlength=n_cells).reshape(self.total.shape)
+
+        t = (year - REFERENCE_YEAR) + w / self.n_weeks
+        n_prov = len(self.provinces)
+        for j, weights in enumerate((None, t, t * t, values, t * values)):
+            self.trend_stats[:, j] += np.bincount(p, weights=weights, minlength=n_prov)
+        np.maximum.at(self.last_key, p, key)
+        return self
+
+    @property
+    def mean(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.total / self.count
+
+    @property
+    def std(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = (self.total_sq - self.total ** 2 / self.count) / (self.count - 1)
+        return np.sqrt(np.clip(var, 0, None))
+
+    def climatology(self):
+        weeks = np.arange(1, self.n_weeks + 1)
+        return pd.DataFrame({
+            self.province_col: np.repeat(self.provinces, self.n_weeks),
+            'week': np.tile(weeks, len(self.provinces)),
+            'mean': self.mean.ravel(),
+            'std': self.std.ravel(),
+            'count': self.count.ravel().astype(np.int64),
+        })
+
+    def anomalies(self, df):
+        p, _, w, values, valid = self._rows(df)
+        known = np.isin(df[self.province_col].to_numpy(), self.provinces)
+        p = np.where(known, p, 0)
+        w = np.clip(w, 0, self.n_weeks - 1)
+        ok = valid & known
+        mean, std = self.mean[p, w], self.std[p, w]
+        anomaly = np.where(ok, values - mean, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            zscore = np.where(ok & (std > 0), anomaly / std, np.nan)
+        return df.assign(**{f'{self.index}_anomaly': anomaly, f'{self.index}_z': zscore})
+
+    def trends(self):
+        n, st, stt, sy, sty = self.trend_stats.T
+        normal = np.stack([np.stack([n, st], axis=-1), np.stack([st, stt], axis=-1)], axis=-2)
+        rhs = np.stack([sy, sty], axis=-1)
+        solvable = (n >= 2) & (np.abs(n * stt - st ** 2) > 1e-9)
+        coef = np.full((len(n), 2), np.nan)
+        if solvable.any():
+            coef[solvable] = np.linalg.solve(normal[solvable], rhs[solvable][..., None])[..., 0]
+        return pd.DataFrame({
+            self.province_col: self.provinces,
+            f'level_{REFERENCE_YEAR}': coef[:, 0],
+            'slope_per_year': coef[:, 1],
+            'slope_per_decade': coef[:, 1] * 10,
+            'n': n.astype(np.int64),
+        })
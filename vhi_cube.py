@@ -0,0 +1,142 @@
+"""
+Щільний куб VHI [область, рік, тиждень] для швидких часових рядів.
+
+Дата кожного тижня рахується один раз при завантаженні (векторно, без
+розбору рядків), а куб будується один раз на набір даних. Часові ряди для
+будь-якого набору областей агрегуються з куба на рівні тижня, місяця чи року
+(середнє, мін, макс) через reduceat по відсортованій осі часу. Вікно тижнів
+може переходити через новий рік (week_range=(49, 9)). Куб індексується лише
+за id області, тож фрейм з кількома країнами (VhiStore.read) відхиляється.
+"""
+
+import numpy as np
+import pandas as pd
+
+INDICES = ('vhi', 'vci', 'tci')
+LEVELS = ('weekly', 'monthly', 'yearly')
+SERIES_COLUMNS = ['provinceid', 'date', 'mean', 'min', 'max']
+
+
+def week_dates(year, week):
+    # Те саме, що pd.to_datetime(f"{year}-W{week}-1", format='%Y-W%W-%w'):
+    # понеділок тижня %W, де тиждень 1 починається з першого понеділка року.
+    year = np.asarray(year, dtype=np.int64)
+    week = np.asarray(week, dtype=np.int64)
+    jan1 = (year - 1970).astype('datetime64[Y]').astype('datetime64[D]')
+    weekday = (jan1.astype(np.int64) + 3) % 7
+    first_monday = jan1 + (7 - weekday) % 7
+    return first_monday + (week - 1) * 7
+
+
+def add_dates(df, year_col='year', week_col='week'):
+    df['date'] = pd.to_datetime(week_dates(df[year_col].to_numpy(), df[week_col].to_numpy()))
+    return df
+
+
+def choose_level(start_year, end_year):
+    span = end_year - start_year + 1
+    if span <= 3:
+        return 'weekly'
+    if span <= 15:
+        return 'monthly'
+    return 'yearly'
+
+
+class VhiCube:
+    def __init__(self, df, province_col='provinceid', indices=INDICES):
+        if 'country' in df.columns and df['country'].nunique() > 1:
+            # Однакові id областей різних країн злилися б в один рядок куба.
+            countries = ', '.join(sorted(map(str, df['country'].unique())))
+            raise ValueError(f"Куб будується для однієї країни, отримано: {countries}")
+        self.provinces = np.sort(df[province_col].unique())
+        self.years = np.arange(int(df['year'].min()), int(df['year'].max()) + 1)
+        self.n_weeks = int(df['week'].max())
+        self.indices = [col for col in indices if col in df.columns]
+
+        p = np.searchsorted(self.provinces, df[province_col].to_numpy())
+        y = df['year'].to_numpy() - self.years[0]
+        w = df['week'].to_numpy().astype(np.int64) - 1
+        shape = (len(self.provinces), len(self.years), self.n_weeks)
+        self.values = {}
+        for col in self.indices:
+            cube = np.full(shape, np.nan, dtype=np.float32)
+            column = df[col].to_numpy(dtype=np.float32)
+            cube[p, y, w] = np.where(column < 0, np.nan, column)
+            self.values[col] = cube
+        self._build_calendar()
+
+    @classmethod
+    def from_arrays(cls, provinces, years, values):
+        # Збірка з готових масивів (наприклад, зі спільної пам'яті) без копіювання кубів.
+        cube = cls.__new__(cls)
+        cube.provinces = np.asarray(provinces)
+        cube.years = np.asarray(years)
+        cube.values = dict(values)
+        cube.indices = list(cube.values)
+        cube.n_weeks = next(iter(cube.values.values())).shape[2] if cube.values else 0
+        cube._build_calendar()
+        return cube
+
+    def to_arrays(self):
+        return {'provinces': self.provinces, 'years': self.years, **self.values}
+
+    def _build_calendar(self):
+        grid_year, grid_week = np.meshgrid(self.years, np.arange(1, self.n_weeks + 1), indexing='ij')
+        self.dates = week_dates(grid_year, grid_week)
+        self.month_keys = self.dates.astype('datetime64[M]').astype(np.int64)
+        self.year_keys = np.broadcast_to(self.years[:, None], grid_year.shape)
+
+    def _slice(self, index, provinces, year_range, week_range):
+        rows = np.searchsorted(self.provinces, provinces)
+        y0, y1 = (year_range[0] - self.years[0], year_range[1] - self.years[0] + 1) if year_range else (0, len(self.years))
+        # Діапазон поза даними дає порожній зріз, а не від'ємний індекс з кінця.
+        y0, y1 = (min(max(y, 0), len(self.years)) for y in (y0, y1))
+        if week_range and week_range[0] > week_range[1]:
+            # Вікно через новий рік (зима 49-9): у межах року тижні 1..w1 ідуть
+            # раніше за w0..52, тож дати лишаються відсортованими.
+            weeks = np.arange(1, self.n_weeks + 1)
+            mask = (weeks >= week_range[0]) | (weeks <= week_range[1])
+            return self.values[index][rows, y0:y1][:, :, mask], (slice(y0, y1), mask)
+        w0, w1 = (week_range[0] - 1, week_range[1]) if week_range else (0, self.n_weeks)
+        w0 = max(w0, 0)
+        cube = self.values[index][rows, y0:y1, w0:w1]
+        return cube, (slice(y0, y1), slice(w0, w1))
+
+    def series(self, index, provinces, year_range=None, week_range=None, level='weekly'):
+        if level not in LEVELS:
+            raise ValueError(f"Невідомий рівень агрегації: {level}")
+        provinces = np.atleast_1d(provinces)
+        # Невідомі id відкидаються, як у VhiQueryService: searchsorted дав би для
+        # них сусідню область або індекс за межами куба.
+        provinces = provinces[np.isin(provinces, self.provinces)]
+        if not len(provinces):
+            return pd.DataFrame(columns=SERIES_COLUMNS)
+        cube, window = self._slice(index, provinces, year_range, week_range)
+        values = cube.reshape(len(provinces), -1)
+        dates = self.dates[window].ravel()
+        if values.shape[1] == 0:
+            return pd.DataFrame(columns=SERIES_COLUMNS)
+
+        if level == 'weekly':
+            mean = low = high = values
+            starts_dates = dates
+        else:
+            keys = (self.month_keys if level == 'monthly' else self.year_keys)[window].ravel()
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            valid = ~np.isnan(values)
+            counts = np.add.reduceat(valid, starts, axis=1)
+            sums = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = sums / counts
+            low = np.fmin.reduceat(values, starts, axis=1)
+            high = np.fmax.reduceat(values, starts, axis=1)
+            starts_dates = dates[starts]
+
+        result = pd.DataFrame({
+            'provinceid': np.repeat(provinces, mean.shape[1]),
+            'date': np.tile(starts_dates, len(provinces)),
+            'mean': np.ravel(mean),
+            'min': np.ravel(low),
+            'max': np.ravel(high),
+        })
+        return result.dropna(subset=['mean']).reset_index(drop=True)
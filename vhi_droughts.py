@@ -0,0 +1,63 @@
+"""
+Виявлення багатотижневих епізодів посухи через run-length encoding.
+
+Увесь ряд (область, рік, тиждень) сортується один раз, після чого початки
+серій тижнів під порогом знаходяться векторно: тиждень починає нову серію,
+якщо попередній рядок належить іншій області, не під порогом або не є
+сусіднім тижнем. Порядковий номер тижня year*52 + week, тож епізоди, що
+переходять через Новий рік, не розриваються. Показники епізодів рахуються
+через reduceat, просторовий охват — як максимум кількості областей під
+порогом в один тиждень упродовж епізоду. Пропуски (-1 NOAA або NaN) не
+рахуються посушливими тижнями і розривають серію.
+"""
+
+import numpy as np
+import pandas as pd
+
+WEEKS_PER_YEAR = 52
+
+
+def detect_episodes(df, index='vhi', threshold=15, min_duration=1, province_col='provinceid'):
+    provinces = df[province_col].to_numpy().astype(np.int64)
+    year = df['year'].to_numpy().astype(np.int64)
+    week = df['week'].to_numpy().astype(np.int64)
+    values = df[index].to_numpy(dtype=np.float64)
+
+    order = np.lexsort((week, year, provinces))
+    provinces, year, week, values = provinces[order], year[order], week[order], values[order]
+    ordinal = year * WEEKS_PER_YEAR + (week - 1)
+    valid = ~np.isnan(values) & (values >= 0)
+    below = valid & (values < threshold)
+
+    prev_below = np.r_[False, below[:-1]]
+    continues = (prev_below
+                 & (np.r_[-1, provinces[:-1]] == provinces)
+                 & (np.r_[-2, ordinal[:-1]] == ordinal - 1))
+    starts_mask = below & ~continues
+
+    rows = np.flatnonzero(below)
+    if not rows.size:
+        return pd.DataFrame(columns=[province_col, 'onset_year', 'onset_week', 'end_year', 'end_week',
+                                     'duration', 'severity', 'min_value', 'mean_value', 'extent'])
+    starts = np.flatnonzero(starts_mask[rows])
+    run_values = values[rows]
+    duration = np.diff(np.r_[starts, rows.size])
+    first, last = rows[starts], rows[starts + duration - 1]
+
+    # Скільки областей під порогом у кожен тиждень (по порядковому номеру).
+    weekly_ordinals, weekly_counts = np.unique(ordinal[rows], return_counts=True)
+    per_row_extent = weekly_counts[np.searchsorted(weekly_ordinals, ordinal[rows])]
+
+    episodes = pd.DataFrame({
+        province_col: provinces[first],
+        'onset_year': year[first],
+        'onset_week': week[first],
+        'end_year': year[last],
+        'end_week': week[last],
+        'duration': duration,
+        'severity': np.add.reduceat(threshold - run_values, starts),
+        'min_value': np.minimum.reduceat(run_values, starts),
+        'mean_value': np.add.reduceat(run_values, starts) / duration,
+        'extent': np.maximum.reduceat(per_row_extent, starts),
+    })
+    return episodes[episodes['duration'] >= min_duration].reset_index(drop=True)
@@ -0,0 +1,207 @@
+"""
+Завантаження та розбір даних VHI з NOAA для довільних країн і областей.
+
+Сирі CSV складаються у raw/<країна>/<тип ряду>/vhi_id_<id>_<час>.csv, а
+розібрані й нормалізовані фрейми — у партиціоноване сховище
+store/series=<тип>/country=<країна>/province=<id>.pkl. Завантаження йде через
+стійку чергу download_queue (SQLite у raw/downloads.sqlite): повтори з
+експоненційною затримкою, обмеження частоти запитів і продовження перерваного
+запуску. Розбір файлів іде в пулі процесів: кожен воркер читає свій CSV і сам
+пише свою партицію, тож назад у головний процес повертається лише короткий звіт.
+Рядки, що не пройшли валідацію (vhi_schema.VHI_RULES), лягають у raw/quarantine.
+
+Приклад:
+    python vhi_ingest.py --country UKR --provinces 1-25 --type Mean VHI_Parea
+"""
+
+import argparse
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from download_queue import DownloadQueue, format_report
+from validation import format_validation
+from vhi_regions import PROVINCES
+from vhi_schema import parse_vhi_csv
+
+BASE_URL = "https://www.star.nesdis.noaa.gov/smcd/emb/vci/VH/get_TS_admin.php"
+SERIES_TYPES = ('Mean', 'VHI_Parea')
+
+
+def build_url(country, province_id, start_year=1981, end_year=2024, series_type='Mean', base_url=BASE_URL):
+    return (f"{base_url}?country={country}&provinceID={province_id}"
+            f"&year1={start_year}&year2={end_year}&type={series_type}")
+
+
+def raw_path(raw_dir, country, province_id, series_type='Mean', timestamp=None):
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(raw_dir, country, series_type, f'vhi_id_{province_id}_{timestamp}.csv')
+
+
+def fetch_all(countries, series_types=('Mean',), raw_dir='raw', start_year=1981, end_year=2024,
+              run_id=None, base_url=BASE_URL, rate=2.0, workers=4, max_attempts=5, deadline=None,
+              retry_failed=False):
+    """Ставить завантаження в чергу й виконує їх; повертає звіт по завданнях."""
+    run_id = run_id or datetime.now().strftime("%Y%m%d")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    jobs = []
+    for country, provinces in countries.items():
+        if not provinces and country not in PROVINCES:
+            # Інакше невідома країна мовчки дає порожній запуск.
+            raise ValueError(f"Невідома країна {country}: вкажіть id областей явно")
+        for series_type in series_types:
+            for province_id in provinces or sorted(PROVINCES[country]):
+                jobs.append((f"{country}/{series_type}/{province_id}",
+                             build_url(country, province_id, start_year, end_year, series_type, base_url),
+                             raw_path(raw_dir, country, province_id, series_type, timestamp)))
+    queue = DownloadQueue(os.path.join(raw_dir, 'downloads.sqlite'))
+    try:
+        queue.enqueue(run_id, jobs, retry_failed=retry_failed)
+        queue.run(run_id, workers=workers, rate=rate, max_attempts=max_attempts, deadline=deadline)
+        return queue.report(run_id)
+    finally:
+        queue.close()
+
+
+def latest_raw_files(raw_dir, country, series_type='Mean'):
+    latest = {}
+    for path in sorted(glob.glob(os.path.join(raw_dir, country, series_type, 'vhi_id_*.csv'))):
+        try:
+            province_id = int(os.path.basename(path).split('_')[2].split('.')[0])
+        except (IndexError, ValueError):
+            continue
+        latest[province_id] = path
+    return latest
+
+
+def parse_file(path, province_id, quarantine_dir=None):
+    return parse_vhi_csv(path, province_id, quarantine_dir)[0]
+
+
+class VhiStore:
+    def __init__(self, root='vhi_store'):
+        self.root = root
+
+    def partition_path(self, country, province_id, series_type='Mean'):
+        return os.path.join(self.root, f'series={series_type}', f'country={country}',
+                            f'province={int(province_id):03d}.pkl')
+
+    def write(self, df, country, province_id, series_type='Mean'):
+        path = self.partition_path(country, province_id, series_type)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def partitions(self, countries=None, provinces=None, series_type='Mean'):
+        found = []
+        for country_dir in sorted(glob.glob(os.path.join(self.root, f'series={series_type}', 'country=*'))):
+            country = os.path.basename(country_dir).split('=', 1)[1]
+            if countries is not None and country not in countries:
+                continue
+            for path in sorted(glob.glob(os.path.join(country_dir, 'province=*.pkl'))):
+                province_id = int(os.path.basename(path)[len('province='):-len('.pkl')])
+                if provinces is None or province_id in provinces:
+                    found.append((country, province_id, path))
+        return found
+
+    def read(self, countries=None, provinces=None, series_type='Mean'):
+        frames = []
+        for country, province_id, path in self.partitions(countries, provinces, series_type):
+            df = pd.read_pickle(path)
+            df['country'] = country
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        df['country'] = df['country'].astype('category')
+        if set(df['country'].cat.categories) <= {'UKR'}:
+            mapping = PROVINCES['UKR']
+            df['province'] = pd.Categorical(df['provinceid'].map(mapping), categories=list(mapping.values()))
+        return df
+
+
+def _parse_job(job):
+    store_root, country, province_id, series_type, path, quarantine_dir = job
+    df, validation = parse_vhi_csv(path, province_id, quarantine_dir)
+    VhiStore(store_root).write(df, country, province_id, series_type)
+    return (country, province_id, series_type, len(df)), validation
+
+
+def ingest(countries, series_types=('Mean',), raw_dir='raw', store_root='vhi_store',
+           start_year=1981, end_year=2024, fetch=True, workers=None, fetch_workers=4, **fetch_options):
+    """countries: {код країни: список id областей або None (усі відомі)}."""
+    if fetch:
+        report = fetch_all(countries, series_types, raw_dir, start_year, end_year,
+                           workers=fetch_workers, **fetch_options)
+        print(format_report(report))
+
+    jobs = []
+    for country, provinces in countries.items():
+        for series_type in series_types:
+            for province_id, path in latest_raw_files(raw_dir, country, series_type).items():
+                if not provinces or province_id in provinces:
+                    jobs.append((store_root, country, province_id, series_type, path,
+                                 os.path.join(raw_dir, 'quarantine')))
+
+    report, validations = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for job, future in zip(jobs, [pool.submit(_parse_job, job) for job in jobs]):
+            try:
+                partition, validation = future.result()
+            except Exception as e:
+                print(f"Помилка розбору {job[4]}: {e}")
+                continue
+            report.append(partition)
+            validations.append(validation)
+    if validations:
+        print(format_validation(validations))
+    return report
+
+
+def parse_provinces(spec):
+    ids = []
+    for part in spec.split(','):
+        if '-' in part:
+            start, end = part.split('-')
+            ids.extend(range(int(start), int(end) + 1))
+        elif part:
+            ids.append(int(part))
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Завантаження та розбір даних VHI")
+    parser.add_argument('--country', nargs='+', default=['UKR'])
+    parser.add_argument('--provinces', help="наприклад 1-25 або 1,3,5 (за замовчуванням усі відомі)")
+    parser.add_argument('--type', nargs='+', default=['Mean'], choices=SERIES_TYPES, dest='series_types')
+    parser.add_argument('--raw-dir', default='raw')
+    parser.add_argument('--store', default='vhi_store')
+    parser.add_argument('--start-year', type=int, default=1981)
+    parser.add_argument('--end-year', type=int, default=2024)
+    parser.add_argument('--no-fetch', action='store_true', help="лише розібрати вже завантажені файли")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--run-id', help="ідентифікатор запуску для продовження (за замовчуванням — дата)")
+    parser.add_argument('--base-url', default=BASE_URL, help="інший ендпоінт, наприклад noaa_stub.py")
+    parser.add_argument('--rate', type=float, default=2.0, help="запитів на секунду")
+    parser.add_argument('--fetch-workers', type=int, default=4)
+    parser.add_argument('--retries', type=int, default=5, help="максимум спроб на файл")
+    parser.add_argument('--deadline', type=float, help="ліміт часу на завантаження, с")
+    parser.add_argument('--retry-failed', action='store_true', help="повторити остаточно невдалі завдання запуску")
+    args = parser.parse_args()
+
+    provinces = parse_provinces(args.provinces) if args.provinces else None
+    report = ingest({country: provinces for country in args.country}, args.series_types,
+                    args.raw_dir, args.store, args.start_year, args.end_year,
+                    fetch=not args.no_fetch, workers=args.workers, run_id=args.run_id,
+                    base_url=args.base_url, rate=args.rate, max_attempts=args.retries,
+                    fetch_workers=args.fetch_workers, deadline=args.deadline, retry_failed=args.retry_failed)
+    print(f"Записано {len(report)} партицій, {sum(rows for *_, rows in report)} рядків")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Програмний API запитів до даних VHI з пагінацією та кешем результатів.
+
+Запит VhiQuery описує набір областей, вікно тижнів (або сезон; вікно може
+переходити через новий рік, як зима 49-9), діапазон років і, за потреби,
+агрегацію за областями/роками/тижнями. VhiQueryService виконує його над
+партиціями одного з джерел:
+    StoreSource — сховище vhi_ingest.VhiStore (партиція = область), читаються
+                  лише партиції потрібних областей;
+    FrameSource — уже завантажений фрейм, один раз розкладений по областях.
+Фільтри та агрегація йдуть через dataset_query, результат сортується
+стабільно і віддається сторінками (Page) без head() і без повторного
+обчислення для наступних сторінок.
+
+Готові результати лежать у LRU-кеші сервісу з ключем (версія даних, запит):
+Streamlit тримає один сервіс на процес, тож однакові запити різних
+користувачів беруться з кешу, а зміна даних (нова партиція, новий файл)
+змінює версію і старі записи просто витісняються.
+
+Приклад:
+    python vhi_query.py --store vhi_store --regions 1,3,5 --season summer --years 2000-2010 --agg mean --by year
+    python vhi_query.py --csv-dir csvfiles --regions 7 --weeks 10-20 --page 2 --page-size 50
+"""
+
+import argparse
+import functools
+import math
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from dataset_query import Dataset, Query, col
+from instrument import count, timed
+from vhi_regions import PROVINCES
+
+INDICES = ('vhi', 'vci', 'tci')
+AGGREGATIONS = ('mean', 'median', 'min', 'max', 'count')
+GROUPINGS = {
+    'province': ['provinceid'],
+    'year': ['year'],
+    'province_year': ['provinceid', 'year'],
+    'week': ['week'],
+    'total': [],
+}
+# Тижні NOAA 1-52: зима — грудень-лютий, тому вікно переходить через новий рік.
+SEASONS = {'winter': (49, 9), 'spring': (10, 22), 'summer': (23, 35), 'autumn': (36, 48)}
+DEFAULT_PAGE_SIZE = 100
+
+
+class VhiQuery:
+    def __init__(self, regions=None, years=None, weeks=None, season=None, index='vhi',
+                 aggregate=None, by='province_year', sort=None, descending=False):
+        if season is not None:
+            if season not in SEASONS:
+                raise ValueError(f"Невідомий сезон: {season}")
+            weeks = SEASONS[season]
+        if aggregate is not None and aggregate not in AGGREGATIONS:
+            raise ValueError(f"Невідома агрегація: {aggregate}")
+        if by not in GROUPINGS:
+            raise ValueError(f"Невідоме групування: {by}")
+        if index not in INDICES:
+            raise ValueError(f"Невідомий індекс: {index}")
+        self.regions = tuple(sorted({int(region) for region in regions})) if regions else None
+        self.years = (int(years[0]), int(years[1])) if years else None
+        self.weeks = (int(weeks[0]), int(weeks[1])) if weeks else None
+        self.index = index
+        self.aggregate = aggregate
+        self.by = by if aggregate else None
+        self.sort = list(sort) if sort else None
+        self.descending = descending
+
+    def key(self):
+        return (self.regions, self.years, self.weeks, self.index, self.aggregate, self.by,
+                tuple(self.sort or ()), self.descending)
+
+    def keys(self):
+        return GROUPINGS[self.by] if self.aggregate else ['provinceid', 'year', 'week']
+
+    def to_query(self, columns):
+        conditions = []
+        if self.years:
+            conditions.append(col('year').between(*self.years))
+        if self.weeks:
+            w0, w1 = self.weeks
+            conditions.append(col('week').between(w0, w1) if w0 <= w1 else (col('week') >= w0) | (col('week') <= w1))
+        query = Query()
+        if conditions:
+            query = query.filter(functools.reduce(lambda a, b: a & b, conditions))
+        if self.aggregate:
+            return query.aggregate(by=self.keys(), weeks=(self.index, 'count'),
+                                   **{self.index: (self.index, self.aggregate)})
+        return query.select(*self.keys(), *[name for name in INDICES if name in columns])
+
+
+class Page:
+    def __init__(self, rows, number, size, total):
+        self.rows = rows
+        self.number = number
+        self.size = size
+        self.total = total
+        self.pages = max(1, math.ceil(total / size))
+
+    @property
+    def has_next(self):
+        return self.number < self.pages
+
+
+class FrameSource:
+    def __init__(self, df, province_col='provinceid'):
+        from digests import data_digest
+
+        self._partitions = {int(pid): part.reset_index(drop=True)
+                            for pid, part in df.groupby(province_col, sort=True, observed=True)}
+        self._version = data_digest(df).hexdigest()[:16]
+
+    def provinces(self):
+        return list(self._partitions)
+
+    def partition(self, province_id):
+        return self._partitions[province_id]
+
+    def version(self):
+        return self._version
+
+
+class StoreSource:
+    def __init__(self, root='vhi_store', country='UKR', series_type='Mean'):
+        from vhi_ingest import VhiStore
+
+        self.store = VhiStore(root)
+        self.country = country
+        self.series_type = series_type
+        self._frames = {}
+        self._paths = None
+
+    def _scan(self):
+        self._paths = {pid: path for _, pid, path in self.store.partitions([self.country], None, self.series_type)}
+        return self._paths
+
+    def provinces(self):
+        return sorted(self._paths if self._paths is not None else self._scan())
+
+    def partition(self, province_id):
+        path = (self._paths if self._paths is not None else self._scan())[province_id]
+        mtime = os.path.getmtime(path)
+        cached = self._frames.get(province_id)
+        if cached is None or cached[0] != mtime:
+            cached = self._frames[province_id] = (mtime, pd.read_pickle(path))
+        return cached[1]
+
+    def version(self):
+        # Кількість і час зміни партицій: новий запуск vhi_ingest дає нову версію.
+        return repr(sorted((pid, os.path.getmtime(path)) for pid, path in self._scan().items()))
+
+
+class VhiQueryService:
+    def __init__(self, source, names=None, cache_size=256, engine=None):
+        self.source = source
+        self.names = PROVINCES['UKR'] if names is None else names
+        self.cache_size = cache_size
+        self.engine = engine
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_frame(cls, df, **options):
+        return cls(FrameSource(df), **options)
+
+    @classmethod
+    def from_store(cls, root='vhi_store', country='UKR', series_type='Mean', **options):
+        return cls(StoreSource(root, country, series_type), names=PROVINCES.get(country, {}), **options)
+
+    def result(self, query):
+        key = (self.source.version(), query.key())
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                count('vhi_query.cache_hits')
+                return self._cache[key]
+            self.misses += 1
+        count('vhi_query.cache_misses')
+        result = self._compute(query)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    @timed('vhi_query.compute')
+    def _compute(self, query):
+        available = set(self.source.provinces())
+        regions = [pid for pid in (query.regions or sorted(available)) if pid in available]
+        frames = [self.source.partition(pid) for pid in regions]
+        if not frames:
+            return pd.DataFrame(columns=query.keys() + ([query.index, 'weeks'] if query.aggregate else [query.index]))
+        frame = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        result = Dataset(frame).collect(query.to_query(frame.columns), self.engine)
+        order = query.sort or query.keys()
+        if order:
+            result = result.sort_values(order, ascending=not query.descending, kind='stable')
+        result = result.reset_index(drop=True)
+        if 'provinceid' in result.columns:
+            result.insert(1, 'province', result['provinceid'].map(self.names))
+        return result
+
+    def run(self, query, page=1, page_size=DEFAULT_PAGE_SIZE):
+        result = self.result(query)
+        start = (page - 1) * page_size
+        return Page(result.iloc[start:start + page_size].reset_index(drop=True), page, page_size, len(result))
+
+    def pages(self, query, page_size=DEFAULT_PAGE_SIZE):
+        page = self.run(query, 1, page_size)
+        yield page
+        while page.has_next:
+            page = self.run(query, page.number + 1, page_size)
+            yield page
+
+
+def parse_range(spec):
+    start, _, end = spec.partition('-')
+    return int(start), int(end or start)
+
+
+def main():
+    from vhi_ingest import parse_provinces
+
+    parser = argparse.ArgumentParser(description="Запити до даних VHI")
+    parser.add_argument('--store', default='vhi_store', help="коренева тека VhiStore")
+    parser.add_argument('--csv-dir', help="читати CSV з теки замість сховища")
+    parser.add_argument('--regions', help="наприклад 1-25 або 1,3,5 (за замовчуванням усі)")
+    parser.add_argument('--years', type=parse_range, help="наприклад 2000-2010")
+    parser.add_argument('--weeks', type=parse_range, help="наприклад 10-20 або 49-9")
+    parser.add_argument('--season', choices=SEASONS)
+    parser.add_argument('--index', default='vhi', choices=INDICES)
+    parser.add_argument('--agg', choices=AGGREGATIONS)
+    parser.add_argument('--by', default='province_year', choices=GROUPINGS)
+    parser.add_argument('--page', type=int, default=1)
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    args = parser.parse_args()
+
+    if args.csv_dir:
+        from dataset_server import load_vhi
+
+        service = VhiQueryService.from_frame(load_vhi(args.csv_dir))
+    else:
+        service = VhiQueryService.from_store(args.store)
+    query = VhiQuery(parse_provinces(args.regions) if args.regions else None, args.years, args.weeks,
+                     args.season, args.index, args.agg, args.by)
+    page = service.run(query, args.page, args.page_size)
+    print(page.rows.to_string(index=False) if page.total else "Немає даних для запиту.")
+    print(f"Сторінка {page.number} з {page.pages}, рядків: {page.total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+Довідник областей за кодами країн NOAA. Без залежностей, тож його можна
+імпортувати з дашборду чи CLI, не підтягуючи pandas.
+"""
+
+PROVINCES = {
+    'UKR': {
+        1: "Вінницька", 2: "Волинська", 3: "Дніпропетровська", 4: "Донецька",
+        5: "Житомирська", 6: "Закарпатська", 7: "Запорізька", 8: "Івано-Франківська",
+        9: "Київська", 10: "Кіровоградська", 11: "Луганська", 12: "Львівська",
+        13: "Миколаївська", 14: "Одеська", 15: "Полтавська", 16: "Рівненська",
+        17: "Сумська", 18: "Тернопільська", 19: "Харківська", 20: "Херсонська",
+        21: "Хмельницька", 22: "Черкаська", 23: "Чернівецька", 24: "Чернігівська",
+        25: "Республіка Крим"
+    },
+}
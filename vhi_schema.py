@@ -0,0 +1,98 @@
+"""
+Схема VHI: розбір CSV з NOAA з валідацією та нормалізація фрейму.
+
+Файли NOAA мають HTML-обгортку (<tt><pre>, <br>, </pre></tt>), стовпці на
+кшталт ' VHI<br>', -1 замість пропусків і порожній стовпець від коми в кінці
+рядка. parse_vhi_csv прибирає розмітку в сирих байтах, знаходить рядок
+заголовка і читає файл одним read_csv, після чого validation перевіряє
+діапазони (рік, тиждень 1-52, індекси 0-100) і відкладає погані рядки в
+карантин — далі йдуть уже типізовані стовпці. normalize_vhi_frame зводить
+склеєний фрейм до компактних типів схеми, додає назви областей і друкує,
+скільки пам'яті займав фрейм до і після. Фрейм не обов'язково пройшов
+валідацію, тож -1 в індексах стає NaN, а рядки без року чи тижня
+відкидаються; для вже розібраного parse_vhi_csv це нічого не змінює.
+"""
+
+import io
+import re
+
+import pandas as pd
+
+from validation import Rule, validate_frame
+
+INDEX_COLUMNS = ['smn', 'smt', 'vci', 'tci', 'vhi']
+
+SCHEMA = {
+    'year': 'int16',
+    'week': 'int8',
+    'provinceid': 'int16',
+    **{col: 'float32' for col in INDEX_COLUMNS},
+}
+
+VHI_RULES = [
+    Rule('year', 'int16', lo=1981),
+    Rule('week', 'int8', lo=1, hi=52),
+    Rule('smn', 'float32', required=False, missing=(-1,)),
+    Rule('smt', 'float32', required=False, missing=(-1,)),
+    *[Rule(col, 'float32', lo=0, hi=100, required=False, missing=(-1,)) for col in ('vci', 'tci', 'vhi')],
+]
+
+HTML_TAG = re.compile(rb'<[^>]*>')
+HEADER_LINE = re.compile(rb'^[ \t]*year[ \t]*,', re.IGNORECASE | re.MULTILINE)
+
+
+def clean_column_names(df):
+    return df.set_axis([str(col).lower().strip().replace('<br>', '').strip() for col in df.columns], axis=1)
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def drop_junk_columns(df):
+    junk = [col for col in df.columns
+            if not col or col.startswith('unnamed') or col not in SCHEMA and df[col].isna().all()]
+    return df.drop(columns=junk)
+
+
+def parse_vhi_csv(path, province_id, quarantine_dir=None):
+    """Один файл NOAA -> (типізований фрейм, звіт валідації)."""
+    with open(path, 'rb') as f:
+        text = HTML_TAG.sub(b'', f.read())
+    header = HEADER_LINE.search(text)
+    if header is None:
+        raise ValueError(f"{path}: не знайдено рядок заголовка year,week,...")
+    df = pd.read_csv(io.BytesIO(text[header.start():]), index_col=False, skipinitialspace=True)
+    df = drop_junk_columns(clean_column_names(df))
+    df, report = validate_frame(df, VHI_RULES, source=path, quarantine_dir=quarantine_dir)
+    df['provinceid'] = pd.Series(province_id, index=df.index, dtype=SCHEMA['provinceid'])
+    # Для VHI_Parea стовпці — пороги площі ('0', '5', ...), їх теж тримаємо у float32.
+    extra = df.select_dtypes(include='float64').columns
+    return df.astype({col: 'float32' for col in extra}), report
+
+
+def normalize_vhi_frame(df, mapping=None, verbose=True):
+    before = memory_mb(df)
+    df = drop_junk_columns(clean_column_names(df))
+
+    if not pd.api.types.is_numeric_dtype(df['year']):
+        df['year'] = pd.to_numeric(df['year'].astype(str).str.extract(r'(\d+)', expand=False), errors='coerce')
+    df = df.dropna(subset=['year', 'week'])
+
+    columns = {}
+    for col, dtype in SCHEMA.items():
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors='coerce')
+        if col in INDEX_COLUMNS:
+            values = values.mask(values == -1)
+        columns[col] = values.astype(dtype)
+    df = df.assign(**columns)
+
+    if mapping is not None and 'provinceid' in df.columns:
+        df['province'] = pd.Categorical(df['provinceid'].map(mapping), categories=list(mapping.values()))
+
+    df = df.reset_index(drop=True)
+    if verbose:
+        print(f"Пам'ять фрейму VHI: {before:.2f} МБ -> {memory_mb(df):.2f} МБ")
+    return df